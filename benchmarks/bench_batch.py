@@ -0,0 +1,72 @@
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from batch import execute, parse_command, run_commands
+from personal_assistant import PersonalAssistant
+from storage import JsonStorage
+
+
+def make_commands(count, seed=1):
+    # Смесь добавлений по всем коллекциям с правками и удалениями уже добавленных записей
+    rng = random.Random(seed)
+    commands = []
+    added = {"notes": 0, "tasks": 0}
+    for i in range(count):
+        roll = rng.random()
+        if roll < 0.4:
+            commands.append({"op": "add", "collection": "finance",
+                             "data": {"type": rng.choice(("доход", "расход")), "amount": rng.randint(1, 10000),
+                                      "category": f"Категория {rng.randrange(50)}",
+                                      "date": f"{rng.randint(1, 28):02d}-{rng.randint(1, 12):02d}-2024"}})
+        elif roll < 0.6:
+            added["notes"] += 1
+            commands.append({"op": "add", "collection": "notes",
+                             "data": {"title": f"Заметка {i}", "content": "Купить молоко и хлеб"}})
+        elif roll < 0.8:
+            added["tasks"] += 1
+            commands.append({"op": "add", "collection": "tasks",
+                             "data": {"title": f"Задача {i}", "priority": "1", "due_date": "01-06-2024"}})
+        elif roll < 0.9:
+            commands.append({"op": "add", "collection": "contacts",
+                             "data": {"name": f"Контакт {i}", "phone": f"+7900{i:07d}"}})
+        elif roll < 0.97 and added["tasks"]:
+            commands.append({"op": "edit", "collection": "tasks", "id": rng.randint(1, added["tasks"]),
+                             "data": {"done": True}})
+        elif added["notes"]:
+            commands.append({"op": "delete", "collection": "notes", "id": rng.randint(1, added["notes"])})
+    return [json.dumps(command, ensure_ascii=False) for command in commands]
+
+
+def one_by_one(assistant, lines):
+    # Как при вводе через меню: каждое изменение сохраняется сразу
+    for line in lines:
+        try:
+            execute(assistant, parse_command(line))
+        except Exception:
+            pass
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    lines = make_commands(count)
+    with tempfile.TemporaryDirectory() as directory:
+        assistant = PersonalAssistant(JsonStorage(os.path.join(directory, "batch")))
+        os.makedirs(assistant.storage.directory)
+        started = time.perf_counter()
+        operations, errors = run_commands(assistant, lines, out=io.StringIO())
+        elapsed = time.perf_counter() - started
+        print(f"Пакет из {operations} команд (ошибок: {errors}): {elapsed:.2f} с, {operations / elapsed:,.0f} оп./с")
+
+        sample = lines[:min(count, 2000)]
+        assistant = PersonalAssistant(JsonStorage(os.path.join(directory, "single")))
+        os.makedirs(assistant.storage.directory)
+        started = time.perf_counter()
+        one_by_one(assistant, sample)
+        single = time.perf_counter() - started
+        print(f"По одной с сохранением каждой ({len(sample)} команд): {single:.2f} с, "
+              f"{len(sample) / single:,.0f} оп./с")
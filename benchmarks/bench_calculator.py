@@ -0,0 +1,39 @@
+import random
+import sys
+import time
+
+from calculator import Calculator, compile_expression
+
+
+def make_expressions(count, distinct, seed=1):
+    # count выражений, среди которых distinct разных: в калькуляторе выражения повторяются
+    rng = random.Random(seed)
+    pool = [f"({rng.randint(1, 1000)} + {rng.randint(1, 1000)}) * {rng.randint(1, 50)} / {rng.randint(1, 9)}"
+            f" - {rng.randint(1, 100)} ** 2" for _ in range(distinct)]
+    return [rng.choice(pool) for _ in range(count)]
+
+
+def rate(function, expressions):
+    started = time.perf_counter()
+    for expression in expressions:
+        function(expression)
+    return len(expressions) / (time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    expressions = make_expressions(count, distinct=500)
+    calc = Calculator()
+    assert all(abs(calc.evaluate(expression) - eval(expression)) < 1e-9 for expression in set(expressions))
+
+    baseline = rate(eval, expressions)
+    print(f"{count} вычислений, 500 разных выражений:")
+    print(f"  eval: {baseline:,.0f} выраж./с")
+    compile_expression.cache_clear()
+    uncached = rate(lambda expression: compile_expression.__wrapped__(expression)(calc), expressions)
+    print(f"  разбор каждый раз: {uncached:,.0f} выраж./с (x{uncached / baseline:.1f})")
+    compiled = rate(lambda expression: compile_expression(expression)(calc), expressions)
+    print(f"  кэш скомпилированных выражений: {compiled:,.0f} выраж./с (x{compiled / baseline:.1f})")
+    calc.invalidate()
+    cached = rate(calc.evaluate, expressions)
+    print(f"  кэш результатов: {cached:,.0f} выраж./с (x{cached / baseline:.1f})")
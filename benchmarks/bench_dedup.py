@@ -0,0 +1,45 @@
+import os
+import random
+import sys
+import time
+
+from contacts import Contact
+from dedup import find_duplicates, transliterate
+from generators import make_contacts
+
+
+def make_near_duplicates(contacts, fraction=0.01, seed=1):
+    # Копии части контактов, записанные иначе: латиницей, в другом порядке
+    # слов, с номером через 8 или с почтой в другом регистре
+    rng = random.Random(seed)
+    next_id = max(contact.id for contact in contacts) + 1
+    copies = []
+    for contact in rng.sample(contacts, int(len(contacts) * fraction)):
+        name, phone, email = contact.name, contact.phone, contact.email
+        variant = rng.randrange(3)
+        if variant == 0:
+            name = transliterate(name).title()
+            phone = "8" + contact.phone_digits[1:]
+        elif variant == 1:
+            name = " ".join(reversed(name.split()))
+            email = email.upper()
+        else:
+            phone = ""
+        copies.append(Contact(next_id, name, phone, email))
+        next_id += 1
+    return copies
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    contacts = make_contacts(count)
+    copies = make_near_duplicates(contacts)
+    contacts += copies
+    print(f"Контактов: {len(contacts)}, из них измененных копий: {len(copies)}, процессоров: {os.cpu_count()}")
+    for workers in sorted({1, os.cpu_count() or 1}):
+        started = time.perf_counter()
+        groups = find_duplicates(contacts, workers=workers)
+        elapsed = time.perf_counter() - started
+        found = sum(1 for _, ids in groups if any(contact_id > count for contact_id in ids))
+        print(f"  исполнителей: {workers}: {elapsed:.1f} с, групп: {len(groups)}, "
+              f"найдено копий: {found} из {len(copies)}")
@@ -0,0 +1,63 @@
+import csv
+import os
+import sys
+import tempfile
+import time
+
+from export import export_all
+from generators import make_contacts, make_notes, make_records, make_tasks
+
+
+def serial_export(collections, directory):
+    # Экспорт в том виде, как он был до export_all: коллекции по очереди, writerow на запись
+    with open(os.path.join(directory, "notes.csv"), 'w', encoding='utf-8', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['id', 'title', 'content', 'timestamp'])
+        for note in collections["notes"]:
+            writer.writerow([note.id, note.title, note.content, note.timestamp])
+    with open(os.path.join(directory, "tasks.csv"), 'w', encoding='utf-8', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['id', 'title', 'description', 'done', 'priority', 'due_date'])
+        for task in collections["tasks"]:
+            writer.writerow([task.id, task.title, task.description, task.done, task.priority,
+                             task.due_date.strftime("%d-%m-%Y") if task.due_date else ""])
+    with open(os.path.join(directory, "contacts.csv"), 'w', encoding='utf-8', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['id', 'name', 'phone', 'email'])
+        for contact in collections["contacts"]:
+            writer.writerow([contact.id, contact.name, contact.phone, contact.email])
+    with open(os.path.join(directory, "finance.csv"), 'w', encoding='utf-8', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['id', 'type', 'amount', 'category', 'date', 'description'])
+        for record in collections["finance"]:
+            writer.writerow([record.id, record.type, record.amount, record.category,
+                             record.date.strftime("%d-%m-%Y"), record.description])
+
+
+def measure(function):
+    started = time.perf_counter()
+    function()
+    return time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    collections = {
+        "notes": make_notes(count),
+        "tasks": make_tasks(count),
+        "contacts": make_contacts(count),
+        "finance": make_records(count),
+    }
+    print(f"По {count} записей в каждой коллекции, процессоров: {os.cpu_count()}")
+    with tempfile.TemporaryDirectory() as directory:
+        baseline = measure(lambda: serial_export(collections, directory))
+        with open(os.path.join(directory, "finance.csv"), encoding="utf-8") as f:
+            expected = f.read()
+        print(f"  последовательно, writerow: {baseline:.2f} с")
+        for workers in (1, 2, 4):
+            elapsed = measure(lambda: export_all(collections, directory, workers=workers))
+            print(f"  export_all, {workers} исполн.: {elapsed:.2f} с (x{baseline / elapsed:.2f})")
+        with open(os.path.join(directory, "finance.csv"), encoding="utf-8") as f:
+            assert f.read() == expected
+        elapsed = measure(lambda: export_all(collections, directory, columnar=True))
+        print(f"  export_all с колоночным файлом финансов: {elapsed:.2f} с (x{baseline / elapsed:.2f})")
@@ -0,0 +1,68 @@
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from finance import FinanceRecord
+from storage import JsonStorage, record_fields
+
+
+class DictFinanceRecord:
+    # FinanceRecord в прежнем виде: атрибуты в __dict__ каждого экземпляра
+    def __init__(self, id, type, amount, category, date, description):
+        self.id = id
+        self.type = type
+        self.amount = amount
+        self.category = category
+        self.date = date
+        self.description = description
+
+
+def old_load(filename, cls):
+    # Прежний load_json: проверка каждого ключа через co_varnames и cls(**item)
+    with open(filename, "r", encoding="utf-8") as f:
+        data = json.load(f)
+        for item in data:
+            if not all(key in item for key in cls.__init__.__code__.co_varnames[1:]):
+                raise ValueError(f"Некорректная структура данных в файле {filename}")
+        return [cls(**item) for item in data]
+
+
+def bytes_per_record(cls, count):
+    tracemalloc.start()
+    records = [cls(i, "расход", 100.0, "Еда", "01-01-2024", "") for i in range(count)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del records
+    return size / count
+
+
+def measure(function, repeat=3):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    print(f"Память на запись: __dict__ {bytes_per_record(DictFinanceRecord, count):.0f} байт, "
+          f"__slots__ {bytes_per_record(FinanceRecord, count):.0f} байт")
+
+    fields = record_fields(FinanceRecord)
+    data = [dict(zip(fields, (i, "расход", 100.0, "Еда", f"{i % 28 + 1:02d}-01-2024", "")))
+            for i in range(count)]
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "finance.json")
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        storage = JsonStorage(directory)
+        old_time = measure(lambda: old_load(filename, FinanceRecord))
+        new_time = measure(lambda: storage.load_json(filename, FinanceRecord))
+    print(f"Загрузка {count} записей: прежний путь {old_time:.3f} с, build_records {new_time:.3f} с, "
+          f"ускорение x{old_time / new_time:.2f}")
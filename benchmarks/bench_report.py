@@ -0,0 +1,46 @@
+import sys
+import time
+from datetime import date
+
+from generators import make_records
+from ledger import FinanceLedger, HAS_NUMPY
+
+
+def python_report(records, start, end):
+    # Тот же расчет, что в generate_report до появления FinanceLedger
+    filtered = [record for record in records if start <= record.date <= end]
+    income = sum(record.amount for record in filtered if record.type == "доход")
+    expense = sum(record.amount for record in filtered if record.type == "расход")
+    return income, expense
+
+
+def measure(function, repeat=5):
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+if __name__ == "__main__":
+    if not HAS_NUMPY:
+        print("NumPy не установлен, сравнивать не с чем.")
+        sys.exit(1)
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    records = make_records(count)
+    start, end = date(2021, 1, 1), date(2021, 12, 31)
+
+    started = time.perf_counter()
+    ledger = FinanceLedger(records)
+    print(f"Записей: {count}, построение FinanceLedger: {time.perf_counter() - started:.3f} с")
+
+    python_time, expected = measure(lambda: python_report(records, start, end))
+    ledger_time, actual = measure(lambda: ledger.totals(start, end))
+    print(f"Python: {python_time * 1000:.1f} мс, FinanceLedger: {ledger_time * 1000:.1f} мс, "
+          f"ускорение x{python_time / ledger_time:.1f}")
+    print(f"Доходы/расходы Python: {expected}, FinanceLedger: {actual}")
+    # Суммы NumPy складываются попарно, поэтому допускаем расхождение в последних знаках
+    assert all(abs(a - b) < 1e-6 * max(1.0, abs(a)) for a, b in zip(expected, actual))
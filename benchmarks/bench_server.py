@@ -0,0 +1,86 @@
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "main", "server.py")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def request(reader, writer, method, path, body=None):
+    data = json.dumps(body, ensure_ascii=False).encode("utf-8") if body is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(data)}\r\n\r\n"
+                 .encode("latin-1") + data)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line == b"\r\n":
+            break
+        if line.lower().startswith(b"content-length:"):
+            length = int(line.split(b":")[1])
+    await reader.readexactly(length)
+    return status
+
+
+async def client(port, count, write_share, latencies, seed):
+    # Одно keep-alive соединение: смесь чтений (список, запись, отчет) и добавлений
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for _ in range(count):
+        roll = rng.random()
+        started = time.perf_counter()
+        if roll < write_share:
+            status = await request(reader, writer, "POST", "/finance", {
+                "type": rng.choice(("доход", "расход")), "amount": rng.randint(1, 10000),
+                "category": f"Категория {rng.randrange(20)}", "date": f"{rng.randint(1, 28):02d}-01-2024"})
+        elif roll < write_share + (1 - write_share) / 2:
+            status = await request(reader, writer, "GET", "/finance?limit=20")
+        else:
+            status = await request(reader, writer, "GET", "/report?start=01-01-2024&end=31-01-2024")
+        latencies.append(time.perf_counter() - started)
+        assert status in (200, 201), status
+    writer.close()
+
+
+async def load(port, clients, requests_per_client, write_share):
+    latencies = []
+    started = time.perf_counter()
+    await asyncio.gather(*(client(port, requests_per_client, write_share, latencies, seed)
+                           for seed in range(clients)))
+    return time.perf_counter() - started, sorted(latencies)
+
+
+if __name__ == "__main__":
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    requests_per_client = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    port = free_port()
+    with tempfile.TemporaryDirectory() as directory:
+        server = subprocess.Popen([sys.executable, os.path.abspath(SERVER), "--port", str(port)],
+                                  cwd=directory, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        try:
+            # До строки о запуске сервер может напечатать сообщения о загрузке данных
+            for line in server.stdout:
+                if "Сервер запущен" in line:
+                    break
+            for write_share in (0.0, 0.2, 1.0):
+                elapsed, latencies = asyncio.run(load(port, clients, requests_per_client, write_share))
+                total = len(latencies)
+                p50 = latencies[total // 2] * 1000
+                p99 = latencies[min(total - 1, int(total * 0.99))] * 1000
+                print(f"{clients} клиентов, доля записи {write_share:.0%}: {total / elapsed:,.0f} запр./с, "
+                      f"p50 {p50:.1f} мс, p99 {p99:.1f} мс")
+        finally:
+            server.terminate()
+            server.wait()
@@ -0,0 +1,39 @@
+import os
+import sys
+import tempfile
+import time
+
+from finance import FinanceRecord
+from generators import make_notes, make_records
+from notes import Note
+from storage import JsonStorage
+
+
+def measure(function):
+    started = time.perf_counter()
+    result = function()
+    return time.perf_counter() - started, result
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    datasets = {"finance": (FinanceRecord, make_records(count)), "notes": (Note, make_notes(count))}
+    with tempfile.TemporaryDirectory() as directory:
+        for name, (cls, records) in datasets.items():
+            results = {}
+            for snapshot_format in ("json", "binary"):
+                storage = JsonStorage(directory, snapshot_format)
+                save_time, _ = measure(lambda: storage.save(name, cls, records))
+                size = os.path.getsize(storage.snapshot_filename(name))
+                load_time, loaded = measure(lambda: storage.load(name, cls))
+                assert [item.to_dict() for item in loaded] == [item.to_dict() for item in records]
+                results[snapshot_format] = (size, save_time, load_time)
+            json_size, json_save, json_load = results["json"]
+            binary_size, binary_save, binary_load = results["binary"]
+            print(f"{name}, {count} записей:")
+            print(f"  размер: JSON {json_size / 1e6:.1f} МБ, двоичный {binary_size / 1e6:.1f} МБ "
+                  f"(x{json_size / binary_size:.1f} меньше)")
+            print(f"  сохранение: JSON {json_save:.3f} с, двоичный {binary_save:.3f} с "
+                  f"(x{json_save / binary_save:.1f})")
+            print(f"  загрузка: JSON {json_load:.3f} с, двоичный {binary_load:.3f} с "
+                  f"(x{json_load / binary_load:.1f})")
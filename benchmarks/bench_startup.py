@@ -0,0 +1,56 @@
+import os
+import sys
+import tempfile
+import time
+
+import personal_assistant
+import storage
+from generators import GENERATORS
+from main import evict_from_page_cache
+from personal_assistant import PersonalAssistant, COLLECTIONS
+from storage import JsonStorage
+
+# Полная загрузка всех коллекций (lazy=False) при разных настройках:
+# разбор стандартным json или orjson, по одной коллекции или в потоках.
+# Размер - общее число записей, поровну на четыре коллекции.
+
+SIZES = {"100k": 100000, "1M": 1000000}
+
+
+def full_load(directory):
+    started = time.perf_counter()
+    PersonalAssistant(JsonStorage(directory), lazy=False)
+    return time.perf_counter() - started
+
+
+def measure(directory, use_orjson, workers):
+    storage.orjson = orjson if use_orjson else None
+    personal_assistant.LOAD_WORKERS = workers
+    files = [os.path.join(directory, name) for name in os.listdir(directory)]
+    evicted = evict_from_page_cache(files)
+    cold = full_load(directory)
+    warm = min(full_load(directory) for _ in range(2))
+    return cold if evicted else None, warm
+
+
+if __name__ == "__main__":
+    orjson = storage.orjson
+    labels = sys.argv[1].split(",") if len(sys.argv) > 1 else list(SIZES)
+    print(f"Процессоров: {os.cpu_count()}, orjson: {'есть' if orjson is not None else 'не установлен'}")
+    for label in labels:
+        total = SIZES[label] if label in SIZES else int(label)
+        with tempfile.TemporaryDirectory() as directory:
+            target = JsonStorage(directory)
+            for name, generate in GENERATORS.items():
+                target.save(name, COLLECTIONS[name][0], generate(total // len(GENERATORS)))
+            # Первая загрузка строит и сохраняет индексы, в замеры она не входит
+            full_load(directory)
+            print(f"Всего записей {label}:")
+            variants = [(False, 1), (False, 4)]
+            if orjson is not None:
+                variants += [(True, 1), (True, 4)]
+            for use_orjson, workers in variants:
+                cold, warm = measure(directory, use_orjson, workers)
+                parser = "orjson" if use_orjson else "json"
+                cold_text = f"{cold:.2f} с" if cold is not None else "-"
+                print(f"  {parser:6} потоков: {workers}: холодный кэш {cold_text}, теплый {warm:.2f} с")
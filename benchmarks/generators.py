@@ -0,0 +1,76 @@
+import random
+from datetime import date, timedelta
+
+from contacts import Contact
+from finance import FinanceRecord
+from notes import Note
+from tasks import Task
+
+# Генераторы синтетических данных. Одинаковые count и seed дают одинаковые
+# записи на любой машине, поэтому результаты разных версий можно сравнивать.
+
+WORDS = ("молоко хлеб встреча отчет проект звонок врач билеты подарок ремонт машина отпуск "
+         "оплата квартира договор письмо банк налог школа спорт книга кино ужин поездка "
+         "собрание презентация бюджет клиент поставщик заказ доставка склад").split()
+
+FIRST_NAMES = ("Александр Мария Иван Анна Дмитрий Елена Сергей Ольга Андрей Татьяна Алексей Наталья "
+               "Михаил Екатерина Николай Юлия Павел Ирина Артем Светлана Пётр Людмила").split()
+
+LAST_NAMES = ("Иванов Петров Смирнов Кузнецов Попов Соколов Лебедев Козлов Новиков Морозов "
+              "Волков Соловьёв Васильев Зайцев Павлов Семенов Голубев Виноградов Богданов Воробьев").split()
+
+
+def make_notes(count, seed=1):
+    rng = random.Random(seed)
+    first_day = date(2020, 1, 1)
+    notes = []
+    for i in range(1, count + 1):
+        title = " ".join(rng.choices(WORDS, k=rng.randint(1, 3))).capitalize()
+        content = " ".join(rng.choices(WORDS, k=rng.randint(5, 30)))
+        day = first_day + timedelta(days=rng.randrange(1500))
+        timestamp = f"{day.strftime('%d-%m-%Y')} {rng.randrange(24):02d}:{rng.randrange(60):02d}:00"
+        notes.append(Note(i, title, content, timestamp))
+    return notes
+
+
+def make_tasks(count, seed=1):
+    rng = random.Random(seed)
+    first_day = date(2024, 1, 1)
+    return [
+        Task(i, f"{rng.choice(WORDS).capitalize()} {i}", " ".join(rng.choices(WORDS, k=5)),
+             rng.random() < 0.3, rng.choice(("1", "2", "3")),
+             first_day + timedelta(days=rng.randrange(730)) if rng.random() < 0.9 else None)
+        for i in range(1, count + 1)
+    ]
+
+
+def make_contacts(count, seed=1):
+    rng = random.Random(seed)
+    contacts = []
+    for i in range(1, count + 1):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        if first[-1] in "ая":
+            last += "а"
+        phone = f"+7 9{rng.randrange(100):02d} {rng.randrange(1000):03d}-{rng.randrange(100):02d}-{rng.randrange(100):02d}"
+        contacts.append(Contact(i, f"{first} {last}", phone, f"user{i}@example.com"))
+    return contacts
+
+
+def make_records(count, seed=1):
+    rng = random.Random(seed)
+    first_day = date(2020, 1, 1)
+    categories = [f"Категория {i}" for i in range(50)]
+    return [
+        FinanceRecord(i, rng.choice(("доход", "расход")), round(rng.uniform(1, 10000), 2),
+                      rng.choice(categories), first_day + timedelta(days=rng.randrange(1500)), "")
+        for i in range(1, count + 1)
+    ]
+
+
+# Коллекция PersonalAssistant -> генератор
+GENERATORS = {
+    "notes": make_notes,
+    "tasks": make_tasks,
+    "contacts": make_contacts,
+    "finance": make_records,
+}
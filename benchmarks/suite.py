@@ -0,0 +1,165 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+
+from export import write_csv
+from generators import GENERATORS
+from ledger import HAS_NUMPY
+from personal_assistant import PersonalAssistant, COLLECTIONS
+from storage import JsonStorage
+
+# Набор замеров: загрузка и сохранение снимков, поиск, отчет, импорт и
+# экспорт CSV для каждой коллекции на синтетических данных нескольких
+# размеров. Результаты пишутся в JSON; --compare показывает изменения
+# относительно результатов предыдущей версии.
+
+SIZES = {"1k": 1000, "10k": 10000, "100k": 100000, "1M": 1000000}
+
+CASES = ("save", "load", "export", "import", "reimport", "search", "report")
+
+IMPORT_METHODS = {
+    "notes": "import_notes_from_csv",
+    "tasks": "import_tasks_from_csv",
+    "contacts": "import_contacts_from_csv",
+    "finance": "import_finance_records_from_csv",
+}
+
+# Запросы поиска и период отчета фиксированы, как и данные
+NOTE_QUERIES = ["молоко", "отчет проект", "бюд", "встреча клиент", "налог"]
+CONTACT_QUERIES = ["Иванов", "мария", "пётр смир", "+7 912", "8 (905) 12", "ольга вол"]
+REPORT_RANGE = (date(2021, 1, 1), date(2021, 12, 31))
+
+
+def timed(function, repeat=1):
+    # Лучшее время из repeat запусков; вывод функции подавляется
+    best = None
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            function()
+            elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_size(size, cases, repeat, snapshot_format):
+    results = []
+
+    def record(case, name, seconds, operations):
+        results.append({"case": case, "collection": name, "size": size, "seconds": round(seconds, 6),
+                        "per_second": round(operations / seconds, 1) if seconds else None})
+        print(f"  {case:7} {name:9} {seconds:9.4f} с", file=sys.stderr)
+
+    data = {name: generate(size) for name, generate in GENERATORS.items()}
+    with tempfile.TemporaryDirectory() as directory:
+        storage = JsonStorage(directory, snapshot_format)
+        for name, items in data.items():
+            cls = COLLECTIONS[name][0]
+            if "save" in cases or "load" in cases:
+                record("save", name, timed(lambda: storage.save(name, cls, items), repeat), size)
+            if "load" in cases:
+                record("load", name, timed(lambda: storage.load(name, cls), repeat), size)
+            csv_file = os.path.join(directory, f"{name}.csv")
+            if cases & {"export", "import", "reimport"}:
+                record("export", name, timed(lambda: write_csv(csv_file, name, items), repeat), size)
+            if "import" in cases or "reimport" in cases:
+                target = os.path.join(directory, f"import_{name}")
+                os.makedirs(target)
+                assistant = PersonalAssistant(JsonStorage(target, snapshot_format))
+                # Импорт в пустую коллекцию: только первый запуск
+                record("import", name, timed(lambda: getattr(assistant, IMPORT_METHODS[name])(csv_file)), size)
+                if "reimport" in cases:
+                    # Повторный импорт того же файла в новом сеансе: все строки - повторы
+                    assistant = PersonalAssistant(JsonStorage(target, snapshot_format))
+                    record("reimport", name,
+                           timed(lambda: getattr(assistant, IMPORT_METHODS[name])(csv_file), repeat), size)
+
+        assistant = PersonalAssistant(storage)
+        if "search" in cases:
+            # Первый запрос включает построение индекса, остальные идут по готовому
+            assistant.collection("notes")
+            assistant.collection("contacts")
+            record("search", "notes", timed(lambda: [assistant.search_notes(query) for query in NOTE_QUERIES],
+                                            repeat), len(NOTE_QUERIES))
+            record("index", "contacts", timed(lambda: assistant.search_contact(CONTACT_QUERIES[0])), 1)
+            record("search", "contacts", timed(lambda: [assistant.search_contact(query, 20)
+                                                        for query in CONTACT_QUERIES], repeat),
+                   len(CONTACT_QUERIES))
+        if "report" in cases:
+            start, end = REPORT_RANGE
+            assistant.collection("finance")
+            record("report", "finance", timed(lambda: assistant.generate_report(
+                start.strftime("%d-%m-%Y"), end.strftime("%d-%m-%Y")), repeat), 1)
+    return results
+
+
+def compare(old, new):
+    # Строки "случай коллекция размер: было -> стало (изменение)" для совпадающих замеров
+    previous = {(item["case"], item["collection"], item["size"]): item["seconds"] for item in old["results"]}
+    lines = []
+    for item in new["results"]:
+        key = (item["case"], item["collection"], item["size"])
+        if key in previous and previous[key]:
+            change = item["seconds"] / previous[key] - 1
+            lines.append(f"{key[0]:7} {key[1]:9} {key[2]:>8}: {previous[key]:.4f} с -> {item['seconds']:.4f} с "
+                         f"({change:+.0%})")
+    return lines
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Замеры производительности персонального помощника")
+    parser.add_argument("--sizes", default="1k,100k,1M",
+                        help=f"размеры данных через запятую: {', '.join(SIZES)} или число (по умолчанию 1k,100k,1M)")
+    parser.add_argument("--cases", default=",".join(CASES),
+                        help=f"замеры через запятую (по умолчанию все: {','.join(CASES)})")
+    parser.add_argument("--repeat", type=int, default=3, help="число повторов, берется лучшее время")
+    parser.add_argument("--snapshot-format", choices=["json", "binary"], default="json")
+    parser.add_argument("--output", default="-", help="файл результатов JSON ('-' - стандартный вывод)")
+    parser.add_argument("--compare", help="файл результатов предыдущего запуска для сравнения")
+    args = parser.parse_args()
+
+    cases = set(args.cases.split(","))
+    results = {
+        "meta": {
+            "revision": git_revision(),
+            "started": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "numpy": HAS_NUMPY,
+            "snapshot_format": args.snapshot_format,
+            "repeat": args.repeat,
+        },
+        "results": [],
+    }
+    for label in args.sizes.split(","):
+        size = SIZES[label] if label in SIZES else int(label)
+        print(f"Размер {label}:", file=sys.stderr)
+        results["results"].extend(run_size(size, cases, args.repeat, args.snapshot_format))
+
+    text = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output == "-":
+        print(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            for line in compare(json.load(f), results):
+                print(line, file=sys.stderr)
@@ -0,0 +1,138 @@
+import ast
+import math
+import operator
+from collections import OrderedDict
+from functools import lru_cache
+
+# Сколько последних результатов хранит калькулятор
+RESULT_CACHE_SIZE = 1024
+
+# Ограничение показателя степени: 9 ** 9 ** 9 не должно подвешивать программу
+MAX_EXPONENT = 10000
+
+# Ограничение размера целого результата в битах: (9 ** 9999) ** 9999 тоже
+MAX_RESULT_BITS = 100000
+
+
+def power(base, exponent):
+    if abs(exponent) > MAX_EXPONENT:
+        raise ValueError("слишком большой показатель степени")
+    if isinstance(base, int) and isinstance(exponent, int) and exponent > 0:
+        if (base.bit_length() - 1) * exponent > MAX_RESULT_BITS:
+            raise ValueError("слишком большой результат возведения в степень")
+    return base ** exponent
+
+
+BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: power,
+}
+
+UNARY_OPERATORS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+FUNCTIONS = {
+    "abs": abs,
+    "round": round,
+    "min": min,
+    "max": max,
+    "sqrt": math.sqrt,
+}
+
+
+def build(node):
+    # Дерево разбора превращается в дерево замыканий: при вычислении
+    # остается только вызов готовых функций, без обхода AST
+    if isinstance(node, ast.Expression):
+        return build(node.body)
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        value = node.value
+        return lambda calc: value
+    if isinstance(node, ast.BinOp) and type(node.op) in BINARY_OPERATORS:
+        function = BINARY_OPERATORS[type(node.op)]
+        left = build(node.left)
+        right = build(node.right)
+        return lambda calc: function(left(calc), right(calc))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in UNARY_OPERATORS:
+        function = UNARY_OPERATORS[type(node.op)]
+        operand = build(node.operand)
+        return lambda calc: function(operand(calc))
+    if isinstance(node, ast.Name):
+        name = node.id
+        return lambda calc: calc.variable(name)
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+        name = node.func.id
+        # Строки допустимы только как аргументы функций: доходы("Еда")
+        args = [(lambda calc, value=arg.value: value)
+                if isinstance(arg, ast.Constant) and type(arg.value) is str else build(arg)
+                for arg in node.args]
+        return lambda calc: calc.call(name, [arg(calc) for arg in args])
+    raise ValueError(f"недопустимое выражение: {ast.unparse(node)}")
+
+
+@lru_cache(maxsize=RESULT_CACHE_SIZE)
+def compile_expression(expression):
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError:
+        raise ValueError(f"не удалось разобрать выражение '{expression}'") from None
+    return build(tree)
+
+
+class Calculator:
+    # Арифметика без eval: разрешены числа, + - * / // % **, переменные
+    # и функции из белого списка. Скомпилированные выражения и результаты
+    # хранятся в LRU-кэшах; результаты сбрасываются через invalidate,
+    # когда меняются данные, на которые ссылаются переменные.
+
+    def __init__(self, variables=None, functions=None):
+        # variables: {имя: функция без аргументов}, functions: {имя: функция}
+        self.variables = variables or {}
+        self.functions = dict(FUNCTIONS, **(functions or {}))
+        self.results = OrderedDict()
+
+    def variable(self, name):
+        getter = self.variables.get(name)
+        if getter is None:
+            raise ValueError(f"неизвестная переменная '{name}'")
+        return getter()
+
+    def call(self, name, args):
+        function = self.functions.get(name)
+        if function is None:
+            raise ValueError(f"неизвестная функция '{name}'")
+        return function(*args)
+
+    def evaluate(self, expression):
+        result = self.results.get(expression)
+        if result is not None:
+            self.results.move_to_end(expression)
+            return result
+        result = compile_expression(expression)(self)
+        self.results[expression] = result
+        if len(self.results) > RESULT_CACHE_SIZE:
+            self.results.popitem(last=False)
+        return result
+
+    def invalidate(self):
+        self.results.clear()
+
+    def evaluate_file(self, file_name):
+        # Генератор (номер строки, выражение, результат или ошибка); пустые строки
+        # и строки, начинающиеся с #, пропускаются
+        with open(file_name, "r", encoding="utf-8") as f:
+            for number, line in enumerate(f, 1):
+                expression = line.strip()
+                if not expression or expression.startswith("#"):
+                    continue
+                try:
+                    yield number, expression, self.evaluate(expression)
+                except Exception as e:
+                    yield number, expression, e
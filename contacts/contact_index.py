@@ -0,0 +1,115 @@
+def normalize_name(name):
+    return name.casefold().replace("ё", "е")
+
+
+from itertools import islice
+
+
+def name_grams(name, size):
+    return {name[i:i + size] for i in range(len(name) - size + 1)}
+
+
+def short_grams(text):
+    # Все подстроки длиной 1-3: запрос такой длины отвечается одним списком
+    return name_grams(text, 1) | name_grams(text, 2) | name_grams(text, 3)
+
+
+def add_grams(grams, contact_id, keys):
+    for gram in keys:
+        ids = grams.get(gram)
+        if ids is None:
+            grams[gram] = {contact_id}
+        else:
+            ids.add(contact_id)
+
+
+def remove_grams(grams, contact_id, keys):
+    for gram in keys:
+        ids = grams[gram]
+        ids.discard(contact_id)
+        if not ids:
+            del grams[gram]
+
+
+def first(ids, limit):
+    # Не больше limit id из ids; без limit - все
+    return set(ids) if limit is None else set(islice(ids, limit))
+
+
+def intersect_grams(grams, query):
+    # Пересечение триграмм запроса начиная с самой редкой
+    postings = sorted((grams.get(gram, set()) for gram in name_grams(query, 3)), key=len)
+    candidates = set(postings[0])
+    for ids in postings[1:]:
+        candidates &= ids
+        if not candidates:
+            break
+    return candidates
+
+
+class ContactIndex:
+    # Индекс для поиска контактов по подстроке: подстроки длиной 1-3 имен и
+    # цифр номеров. Короткий запрос - это один готовый список, для длинного
+    # кандидаты - пересечение списков по триграммам, затем проверка подстроки.
+    # С limit поиск останавливается, набрав limit контактов.
+
+    def __init__(self, contacts=()):
+        self.grams = {}
+        self.names = {}
+        self.phone_grams = {}
+        self.phones = {}
+        for contact in contacts:
+            self.put(contact)
+
+    def __len__(self):
+        return len(self.names)
+
+    def put(self, contact):
+        self.remove(contact.id)
+        name = normalize_name(contact.name)
+        self.names[contact.id] = name
+        add_grams(self.grams, contact.id, short_grams(name))
+        digits = contact.phone_digits
+        self.phones[contact.id] = digits
+        add_grams(self.phone_grams, contact.id, short_grams(digits))
+
+    def remove(self, contact_id):
+        name = self.names.pop(contact_id, None)
+        if name is None:
+            return
+        remove_grams(self.grams, contact_id, short_grams(name))
+        remove_grams(self.phone_grams, contact_id, short_grams(self.phones.pop(contact_id)))
+
+    def search_name(self, query, limit=None):
+        query = normalize_name(query)
+        if not query:
+            return set()
+        if len(query) <= 3:
+            return first(self.grams.get(query, ()), limit)
+        names = self.names
+        return first((contact_id for contact_id in intersect_grams(self.grams, query)
+                      if query in names[contact_id]), limit)
+
+    def search_phone(self, query, limit=None):
+        # Любая часть номера, например последние цифры; номер, набранный
+        # через 8, находит и записанный через 7
+        digits = "".join(ch for ch in query if ch.isdigit())
+        if not digits:
+            return set()
+        if len(digits) <= 3:
+            return first(self.phone_grams.get(digits, ()), limit)
+        phones = self.phones
+        found = first((contact_id for contact_id in intersect_grams(self.phone_grams, digits)
+                       if digits in phones[contact_id]), limit)
+        if digits[0] == "8" and (limit is None or len(found) < limit):
+            prefix = "7" + digits[1:]
+            found |= first((contact_id for contact_id in intersect_grams(self.phone_grams, prefix)
+                            if phones[contact_id].startswith(prefix)), limit)
+        return found
+
+    def search(self, query, limit=None):
+        # id найденных контактов по возрастанию; с limit - не больше limit первых найденных
+        found = self.search_name(query, limit)
+        if limit is None or len(found) < limit:
+            found |= self.search_phone(query, limit)
+        return sorted(found)[:limit]
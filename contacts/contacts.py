@@ -1,10 +1,32 @@
+def normalize_phone(phone):
+    # Только цифры; российские номера приводятся к виду 7XXXXXXXXXX
+    digits = "".join(ch for ch in phone if ch.isdigit())
+    if len(digits) == 11 and digits[0] == "8":
+        digits = "7" + digits[1:]
+    elif len(digits) == 10:
+        digits = "7" + digits
+    return digits
+
+
 class Contact:
+    __slots__ = ("id", "name", "_phone", "phone_digits", "email")
+
     def __init__(self, id, name, phone, email):
         self.id = id
         self.name = name
         self.phone = phone
         self.email = email
 
+    @property
+    def phone(self):
+        return self._phone
+
+    @phone.setter
+    def phone(self, value):
+        # Нормализованный номер считается один раз, при записи телефона
+        self._phone = value
+        self.phone_digits = normalize_phone(value)
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -0,0 +1,216 @@
+from difflib import SequenceMatcher
+
+from contact_index import normalize_name
+from parallel import SHARED, map_jobs
+
+# Пары с оценкой не ниже порога считаются одним человеком
+DUPLICATE_THRESHOLD = 0.85
+
+# Вес сходства имен в оценке; остальное - совпадение телефона или почты
+NAME_WEIGHT = 0.6
+
+# Блоки больше этого размера (частые имена) сравниваются не попарно, а
+# скользящим окном по отсортированным именам: каждый контакт - с DEDUP_WINDOW соседями
+MAX_BLOCK_SIZE = 50
+DEDUP_WINDOW = 10
+
+# Сколько пар-кандидатов в одном задании пула
+JOB_PAIRS = 200000
+
+# По скольку последних цифр номера контакты попадают в один блок
+PHONE_SUFFIX_LENGTH = 7
+
+TRANSLIT = str.maketrans({
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ж": "zh", "з": "z", "и": "i",
+    "й": "i", "к": "k", "л": "l", "м": "m", "н": "n", "о": "o", "п": "p", "р": "r", "с": "s",
+    "т": "t", "у": "u", "ф": "f", "х": "kh", "ц": "ts", "ч": "ch", "ш": "sh", "щ": "sch", "ъ": "",
+    "ы": "y", "ь": "", "э": "e", "ю": "yu", "я": "ya",
+})
+
+# Разные латинские написания одного звука, по порядку замены
+PHONETIC_REPLACEMENTS = (
+    ("sch", "sh"), ("tch", "ch"), ("kh", "h"), ("tz", "c"), ("ts", "c"), ("ph", "f"), ("ck", "k"),
+    ("w", "v"), ("x", "ks"), ("q", "k"), ("y", "i"), ("j", "i"),
+)
+
+VOWELS = str.maketrans("", "", "aeiou")
+
+
+def transliterate(name):
+    # "Пётр  Соловьёв" -> "petr solovev": регистр, ё и кириллица не мешают сравнению
+    return " ".join(normalize_name(name).translate(TRANSLIT).split())
+
+
+def phonetic_key(word):
+    # Согласный скелет слова: первая буква, затем согласные без повторов.
+    # Solovyov, Соловьев и Соловьёв дают один ключ "slv"
+    for old, new in PHONETIC_REPLACEMENTS:
+        word = word.replace(old, new)
+    if not word:
+        return ""
+    key = [word[0]]
+    for ch in word[1:].translate(VOWELS):
+        if ch != key[-1] and ch.isalpha():
+            key.append(ch)
+    return "".join(key)
+
+
+def normalize_email(email):
+    # Метки после "+" в локальной части не меняют адрес
+    local, _, domain = email.strip().casefold().partition("@")
+    return local.split("+")[0], domain
+
+
+def contact_features(contact):
+    # (id, имя для сравнения, фонетический ключ имени, цифры номера, локальная часть почты, домен)
+    words = sorted(transliterate(contact.name).split())
+    local, domain = normalize_email(contact.email)
+    return (contact.id, " ".join(words), " ".join(sorted(phonetic_key(word) for word in words)),
+            contact.phone_digits, local, domain)
+
+
+def contact_similarity(a, b):
+    # Совпадение телефона или почты: 1 - тот же номер или адрес,
+    # 0.9 - те же последние цифры номера, 0.8 - тот же адрес в другом домене
+    score = 0.0
+    if a[3] and len(a[3]) >= PHONE_SUFFIX_LENGTH:
+        if a[3] == b[3]:
+            return 1.0
+        if a[3][-PHONE_SUFFIX_LENGTH:] == b[3][-PHONE_SUFFIX_LENGTH:]:
+            score = 0.9
+    if a[4] and a[4] == b[4]:
+        if a[5] == b[5]:
+            return 1.0
+        score = max(score, 0.8)
+    return score
+
+
+def pair_score(a, b, threshold=DUPLICATE_THRESHOLD):
+    # Сходство имен считается только для пар, которые могут набрать порог
+    contact = (1 - NAME_WEIGHT) * contact_similarity(a, b)
+    if contact + NAME_WEIGHT < threshold:
+        return 0.0
+    matcher = SequenceMatcher(None, a[1], b[1], autojunk=False)
+    if contact + NAME_WEIGHT * matcher.quick_ratio() < threshold:
+        return 0.0
+    return contact + NAME_WEIGHT * matcher.ratio()
+
+
+def block_pairs(block):
+    if len(block) <= MAX_BLOCK_SIZE:
+        for position, i in enumerate(block):
+            for j in block[position + 1:]:
+                yield i, j
+    else:
+        for position, i in enumerate(block):
+            for j in block[position + 1:position + 1 + DEDUP_WINDOW]:
+                yield i, j
+
+
+def block_cost(block):
+    size = len(block)
+    return size * (size - 1) // 2 if size <= MAX_BLOCK_SIZE else size * DEDUP_WINDOW
+
+
+# Ключи блоков: (ключ блока, порядок внутри блока); пустой ключ - контакт в блок не попадает
+def phone_block_key(f):
+    return f[3][-PHONE_SUFFIX_LENGTH:] if len(f[3]) >= PHONE_SUFFIX_LENGTH else "", ""
+
+
+def email_block_key(f):
+    return f"{f[4]}@{f[5]}" if f[4] else "", ""
+
+
+def name_block_key(f):
+    # Внутри блока по имени контакты упорядочены по полному имени - для окна
+    return f[2], f[1]
+
+
+BLOCK_KEYS = (phone_block_key, email_block_key, name_block_key)
+
+
+def build_blocks(features):
+    # Блоки - группы контактов с одинаковым ключом; строятся сортировкой
+    # индексов, без словаря на миллион ключей
+    blocks = []
+    for block_key in BLOCK_KEYS:
+        keys = [block_key(f) for f in features]
+        order = sorted(range(len(features)), key=keys.__getitem__)
+        block = []
+        previous = None
+        for i in order:
+            current = keys[i][0]
+            if current != previous:
+                if len(block) > 1:
+                    blocks.append(block)
+                block = []
+                previous = current
+            if current:
+                block.append(i)
+        if len(block) > 1:
+            blocks.append(block)
+    return blocks
+
+
+def dedup_job(job):
+    start, end, threshold = job
+    features = SHARED["features"]
+    matches = []
+    for block in SHARED["blocks"][start:end]:
+        for i, j in block_pairs(block):
+            score = pair_score(features[i], features[j], threshold)
+            if score >= threshold:
+                matches.append((i, j, score))
+    return matches
+
+
+def split_jobs(blocks, threshold):
+    jobs = []
+    start = 0
+    cost = 0
+    for position, block in enumerate(blocks):
+        cost += block_cost(block)
+        if cost >= JOB_PAIRS:
+            jobs.append((start, position + 1, threshold))
+            start, cost = position + 1, 0
+    if start < len(blocks):
+        jobs.append((start, len(blocks), threshold))
+    return jobs
+
+
+def find_duplicates(contacts, threshold=DUPLICATE_THRESHOLD, workers=1):
+    # Группы похожих контактов: [(оценка, [id, ...]), ...] по убыванию оценки.
+    # Сравниваются только пары из общего блока, поэтому работа растет
+    # почти линейно, а не как n². workers > 1 - пул процессов (или потоков,
+    # если fork недоступен), None - по числу процессоров.
+    features = [contact_features(contact) for contact in contacts]
+    blocks = build_blocks(features)
+    jobs = split_jobs(blocks, threshold)
+    results = map_jobs(dedup_job, jobs, workers, {"features": features, "blocks": blocks})
+
+    # Объединение пар в группы (система непересекающихся множеств)
+    parent = {}
+
+    def find(i):
+        root = i
+        while parent.get(root, root) != root:
+            root = parent[root]
+        while i != root:
+            parent[i], i = root, parent[i]
+        return root
+
+    best = {}
+    for matches in results:
+        for i, j, score in matches:
+            a, b = find(i), find(j)
+            if a != b:
+                parent[max(a, b)] = min(a, b)
+                best[min(a, b)] = max(best.pop(max(a, b), 0.0), best.get(min(a, b), 0.0), score)
+            else:
+                best[a] = max(best.get(a, 0.0), score)
+    groups = {}
+    for i in parent:
+        root = find(i)
+        groups.setdefault(root, {root}).add(i)
+    return sorted(((round(best[root], 3), sorted(features[i][0] for i in members))
+                   for root, members in groups.items()), key=lambda group: (-group[0], group[1]))
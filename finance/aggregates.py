@@ -0,0 +1,124 @@
+import zlib
+from bisect import bisect_left
+from datetime import date
+
+# Допустимое расхождение сумм при проверке (накопление ошибок округления float)
+TOLERANCE = 1e-6
+
+CHECKSUM_MODULUS = 2 ** 64
+
+
+def record_checksum(record):
+    # Только поля, от которых зависят итоги, и id
+    return zlib.crc32(f"{record.id}\0{record.type}\0{record.amount!r}\0{record.category}\0"
+                      f"{record.date.toordinal()}".encode("utf-8"))
+
+
+def records_checksum(records):
+    # Сумма контрольных сумм записей не зависит от их порядка и обновляется
+    # при каждом изменении, поэтому сохраненные итоги можно сверить с записями
+    return sum(map(record_checksum, records)) % CHECKSUM_MODULUS
+
+
+class FinanceAggregates:
+    # Итоги доходов и расходов по дням, месяцам, категориям и типам, которые
+    # обновляются при каждом изменении записей. Суммы за период считаются по
+    # префиксным суммам дневных итогов: два bisect вместо прохода по записям.
+
+    def __init__(self, records=()):
+        self.count = 0
+        self.checksum = 0
+        self.days = {}
+        self.months = {}
+        self.categories = {}
+        self.types = {}
+        self.prefix_days = None
+        self.prefix_income = None
+        self.prefix_expense = None
+        for record in records:
+            self.add(record)
+
+    def apply(self, record, sign):
+        income = record.amount * sign if record.type == "доход" else 0.0
+        expense = record.amount * sign if record.type == "расход" else 0.0
+        for totals, key in ((self.days, record.date.toordinal()),
+                            (self.months, record.date.strftime("%Y-%m")),
+                            (self.categories, record.category)):
+            entry = totals.setdefault(key, [0.0, 0.0, 0])
+            entry[0] += income
+            entry[1] += expense
+            entry[2] += sign
+            if not entry[2]:
+                del totals[key]
+        self.types[record.type] = self.types.get(record.type, 0.0) + record.amount * sign
+        self.count += sign
+        self.checksum = (self.checksum + sign * record_checksum(record)) % CHECKSUM_MODULUS
+        self.prefix_days = None
+
+    def add(self, record):
+        self.apply(record, 1)
+
+    def remove(self, record):
+        self.apply(record, -1)
+
+    def build_prefix(self):
+        self.prefix_days = sorted(self.days)
+        self.prefix_income = [0.0]
+        self.prefix_expense = [0.0]
+        for day in self.prefix_days:
+            income, expense, _ = self.days[day]
+            self.prefix_income.append(self.prefix_income[-1] + income)
+            self.prefix_expense.append(self.prefix_expense[-1] + expense)
+
+    def totals(self, start=None, end=None):
+        if self.prefix_days is None:
+            self.build_prefix()
+        low = 0 if start is None else bisect_left(self.prefix_days, start.toordinal())
+        high = len(self.prefix_days) if end is None else bisect_left(self.prefix_days, end.toordinal() + 1)
+        return (self.prefix_income[high] - self.prefix_income[low],
+                self.prefix_expense[high] - self.prefix_expense[low])
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "checksum": self.checksum,
+            "days": {date.fromordinal(day).strftime("%d-%m-%Y"): entry for day, entry in self.days.items()},
+            "months": self.months,
+            "categories": self.categories,
+            "types": self.types
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        aggregates = cls()
+        aggregates.count = data["count"]
+        aggregates.checksum = data.get("checksum")
+        aggregates.days = {
+            date(int(day[6:]), int(day[3:5]), int(day[:2])).toordinal(): entry
+            for day, entry in data["days"].items()
+        }
+        aggregates.months = data["months"]
+        aggregates.categories = data["categories"]
+        aggregates.types = data["types"]
+        return aggregates
+
+    def diff(self, other):
+        # Список расхождений с other в виде строк "раздел ключ: было -> стало"
+        differences = []
+        if self.count != other.count:
+            differences.append(f"количество записей: {self.count} -> {other.count}")
+        for section in ("days", "months", "categories"):
+            mine = getattr(self, section)
+            theirs = getattr(other, section)
+            for key in sorted(set(mine) | set(theirs), key=str):
+                left = mine.get(key, [0.0, 0.0, 0])
+                right = theirs.get(key, [0.0, 0.0, 0])
+                if (left[2] != right[2] or abs(left[0] - right[0]) > TOLERANCE
+                        or abs(left[1] - right[1]) > TOLERANCE):
+                    if section == "days":
+                        key = date.fromordinal(key).strftime("%d-%m-%Y")
+                    differences.append(f"{section} {key}: {left} -> {right}")
+        for key in sorted(set(self.types) | set(other.types)):
+            if abs(self.types.get(key, 0.0) - other.types.get(key, 0.0)) > TOLERANCE:
+                differences.append(f"types {key}: {self.types.get(key, 0.0)} -> {other.types.get(key, 0.0)}")
+        return differences
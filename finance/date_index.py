@@ -0,0 +1,67 @@
+from bisect import bisect_left
+
+
+class FinanceDateIndex:
+    # Финансовые записи, упорядоченные по (дата, id). Запрос за период - это
+    # два bisect и проход по срезу, то есть O(log n + k) вместо полного перебора.
+
+    def __init__(self, records=()):
+        self.keys_by_id = {record.id: (record.date.toordinal(), record.id) for record in records}
+        self.keys = sorted(self.keys_by_id.values())
+        by_id = {record.id: record for record in records}
+        self.records = [by_id[record_id] for _, record_id in self.keys]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def put(self, record):
+        # Запись могла быть изменена на месте, поэтому старый ключ берется из keys_by_id
+        self.remove(record.id)
+        key = (record.date.toordinal(), record.id)
+        position = bisect_left(self.keys, key)
+        self.keys.insert(position, key)
+        self.records.insert(position, record)
+        self.keys_by_id[record.id] = key
+
+    def extend(self, records):
+        records = list(records)
+        if len(records) < 64:
+            for record in records:
+                self.put(record)
+            return
+        # Большую порцию (импорт) выгоднее слить целиком: сортировка двух
+        # упорядоченных серий в Timsort линейна
+        for record in records:
+            self.remove(record.id)
+        by_id = dict(zip((key[1] for key in self.keys), self.records))
+        for record in records:
+            key = (record.date.toordinal(), record.id)
+            self.keys_by_id[record.id] = key
+            self.keys.append(key)
+            by_id[record.id] = record
+        self.keys.sort()
+        self.records = [by_id[record_id] for _, record_id in self.keys]
+
+    def remove(self, record_id):
+        key = self.keys_by_id.pop(record_id, None)
+        if key is None:
+            return
+        position = bisect_left(self.keys, key)
+        del self.keys[position]
+        del self.records[position]
+
+    def bounds(self, start=None, end=None):
+        low = 0 if start is None else bisect_left(self.keys, (start.toordinal(),))
+        high = len(self.keys) if end is None else bisect_left(self.keys, (end.toordinal() + 1,))
+        return low, high
+
+    def range(self, start=None, end=None):
+        # Генератор: записи за период отдаются по одной, без промежуточного списка
+        low, high = self.bounds(start, end)
+        records = self.records
+        for position in range(low, high):
+            yield records[position]
+
+    def count(self, start=None, end=None):
+        low, high = self.bounds(start, end)
+        return high - low
@@ -1,22 +1,28 @@
 from datetime import datetime, date
+from functools import lru_cache
+
+
+# В выписках одни и те же даты повторяются тысячи раз, поэтому разбор кэшируется
+@lru_cache(maxsize=8192)
+def parse_date(value):
+    return datetime.strptime(value, "%d-%m-%Y").date()
+
 
 class FinanceRecord:
+    __slots__ = ("id", "type", "amount", "category", "date", "description")
+
     def __init__(self, id, type, amount, category, date, description):
         self.id = id
         self.type = type
         self.amount = amount
         self.category = category
-        try:
-            self.date = datetime.strptime(date, "%d-%m-%Y").date()
-        except (TypeError, ValueError):
-            self.date = date
-        if isinstance(self.date, str):
-            self.date = datetime.strptime(self.date, "%d-%m-%Y").date()
+        self.date = parse_date(date) if isinstance(date, str) else date
         self.description = description
 
     def to_dict(self):
         return {
             "id": self.id,
+            "type": self.type,
             "amount": self.amount,
             "category": self.category,
             "date": self.date.strftime("%d-%m-%Y"),
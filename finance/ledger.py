@@ -0,0 +1,128 @@
+try:
+    import numpy as np
+except ImportError:  # без NumPy отчеты считаются по списку записей
+    np = None
+
+HAS_NUMPY = np is not None
+
+
+class FinanceLedger:
+    # Колоночное представление финансовых записей: даты (ординалы), суммы,
+    # коды категорий и флаги типа лежат в массивах NumPy, поэтому фильтры
+    # по периоду и категории и суммы считаются за один векторный проход.
+    # Строки удаленных записей помечаются в alive и вычищаются при compact.
+
+    def __init__(self, records=()):
+        self.size = 0
+        self.dead = 0
+        self.positions = {}
+        self.category_codes = {}
+        self.category_names = []
+        self.allocate(max(len(records), 1024))
+        self.extend(records)
+
+    def allocate(self, capacity):
+        old_size = self.size
+        columns = {
+            "ids": np.int64,
+            "dates": np.int32,
+            "amounts": np.float64,
+            "categories": np.int32,
+            "incomes": np.bool_,
+            "expenses": np.bool_,
+            "alive": np.bool_,
+        }
+        for column, dtype in columns.items():
+            array = np.zeros(capacity, dtype=dtype)
+            if old_size:
+                array[:old_size] = getattr(self, column)[:old_size]
+            setattr(self, column, array)
+
+    def category_code(self, category):
+        code = self.category_codes.get(category)
+        if code is None:
+            code = len(self.category_names)
+            self.category_codes[category] = code
+            self.category_names.append(category)
+        return code
+
+    def extend(self, records):
+        for record in records:
+            self.put(record)
+
+    def put(self, record):
+        row = self.positions.get(record.id)
+        if row is None:
+            if self.size == len(self.ids):
+                self.allocate(len(self.ids) * 2)
+            row = self.size
+            self.size += 1
+            self.positions[record.id] = row
+            self.ids[row] = record.id
+            self.alive[row] = True
+        self.dates[row] = record.date.toordinal()
+        self.amounts[row] = record.amount
+        self.categories[row] = self.category_code(record.category)
+        self.incomes[row] = record.type == "доход"
+        self.expenses[row] = record.type == "расход"
+
+    def remove(self, record_id):
+        row = self.positions.pop(record_id, None)
+        if row is None:
+            return
+        self.alive[row] = False
+        self.dead += 1
+        if self.dead > self.size // 2:
+            self.compact()
+
+    def compact(self):
+        keep = self.alive[:self.size]
+        for column in ("ids", "dates", "amounts", "categories", "incomes", "expenses", "alive"):
+            values = getattr(self, column)[:self.size][keep]
+            array = np.zeros(max(len(values) * 2, 1024), dtype=values.dtype)
+            array[:len(values)] = values
+            setattr(self, column, array)
+        self.size = int(keep.sum())
+        self.dead = 0
+        self.positions = {int(record_id): row for row, record_id in enumerate(self.ids[:self.size])}
+
+    def mask(self, start=None, end=None, category=None):
+        mask = self.alive[:self.size].copy()
+        dates = self.dates[:self.size]
+        if start is not None:
+            mask &= dates >= start.toordinal()
+        if end is not None:
+            mask &= dates <= end.toordinal()
+        if category is not None:
+            code = self.category_codes.get(category)
+            if code is None:
+                mask[:] = False
+            else:
+                mask &= self.categories[:self.size] == code
+        return mask
+
+    def select_ids(self, start=None, end=None, category=None):
+        return self.ids[:self.size][self.mask(start, end, category)].tolist()
+
+    def totals(self, start=None, end=None, category=None):
+        mask = self.mask(start, end, category)
+        amounts = self.amounts[:self.size]
+        income = amounts[mask & self.incomes[:self.size]].sum()
+        expense = amounts[mask & self.expenses[:self.size]].sum()
+        return float(income), float(expense)
+
+    def by_category(self, start=None, end=None):
+        # {категория: (доходы, расходы)} за период
+        mask = self.mask(start, end)
+        categories = self.categories[:self.size]
+        amounts = self.amounts[:self.size]
+        incomes = mask & self.incomes[:self.size]
+        expenses = mask & self.expenses[:self.size]
+        count = len(self.category_names)
+        income = np.bincount(categories[incomes], weights=amounts[incomes], minlength=count)
+        expense = np.bincount(categories[expenses], weights=amounts[expenses], minlength=count)
+        present = np.bincount(categories[mask], minlength=count)
+        return {
+            self.category_names[code]: (float(income[code]), float(expense[code]))
+            for code in range(count) if present[code]
+        }
@@ -0,0 +1,219 @@
+import argparse
+import contextlib
+import json
+import shlex
+import sys
+import time
+from datetime import datetime
+
+from personal_assistant import PersonalAssistant, COLLECTIONS
+from contacts import Contact
+from finance import FinanceRecord, parse_date
+from notes import Note
+from tasks import Task
+from main import add_storage_arguments, make_storage
+from storage import record_fields
+
+# Позиционные аргументы команд в текстовом сценарии, например:
+#   add notes title=Покупки content="молоко, хлеб"
+#   edit tasks 3 done=да
+#   delete contacts 5 6
+#   import finance выписка.csv
+#   report 01-01-2024 31-12-2024
+#   report 01-01-2024 31-12-2024 category=Продукты
+POSITIONAL = {
+    "add": ["collection"],
+    "edit": ["collection", "id"],
+    "delete": ["collection", "ids"],
+    "import": ["collection", "file"],
+    "report": ["start", "end"],
+}
+
+IMPORTERS = {
+    "notes": "import_notes_from_csv",
+    "tasks": "import_tasks_from_csv",
+    "contacts": "import_contacts_from_csv",
+    "finance": "import_finance_records_from_csv",
+}
+
+
+class CommandError(Exception):
+    pass
+
+
+def parse_command(line):
+    # Строка JSON ({"op": "add", "collection": "notes", "data": {...}}) или текстовая команда
+    if line.startswith("{"):
+        return json.loads(line)
+    tokens = shlex.split(line)
+    op = tokens[0]
+    if op not in POSITIONAL:
+        raise CommandError(f"неизвестная команда '{op}'")
+    command = {"op": op, "data": {}}
+    names = POSITIONAL[op]
+    positional = []
+    for token in tokens[1:]:
+        key, sep, value = token.partition("=")
+        if sep:
+            command["data"][key] = value
+        else:
+            positional.append(token)
+    for position, value in enumerate(positional):
+        name = names[min(position, len(names) - 1)]
+        if name == "ids":
+            command.setdefault("ids", []).append(int(value))
+        else:
+            command[name] = int(value) if name == "id" else value
+    return command
+
+
+def convert_fields(name, data):
+    # Имена и типы полей проверяются до любых изменений: неверная запись не
+    # должна попасть ни в индексы, ни в итоги
+    fields = dict(data)
+    fields.pop("id", None)
+    unknown = sorted(set(fields) - set(record_fields(COLLECTIONS[name][0])))
+    if unknown:
+        raise CommandError(f"неизвестные поля: {', '.join(unknown)}")
+    converted = set()
+    if name == "finance":
+        if "amount" in fields:
+            if isinstance(fields["amount"], bool):
+                raise CommandError("поле amount должно быть числом")
+            fields["amount"] = float(fields["amount"])
+        if "date" in fields:
+            fields["date"] = parse_date(fields["date"]) if fields["date"] else None
+        if "type" in fields and fields["type"] not in ("доход", "расход"):
+            raise CommandError(f"неизвестный тип записи '{fields['type']}'")
+        converted = {"amount", "date"}
+    if name == "tasks" and "done" in fields:
+        fields["done"] = fields["done"] in (True, 1, "1", "true", "да")
+        converted = {"done"}
+    for field, value in fields.items():
+        if field in converted or value is None or isinstance(value, str):
+            continue
+        # Приоритет можно задать и числом
+        if not (field == "priority" and type(value) is int):
+            raise CommandError(f"поле {field} должно быть строкой")
+    return fields
+
+
+def make_record(assistant, name, data):
+    fields = convert_fields(name, data)
+    record_id = assistant.new_id(name)
+    try:
+        if name == "notes":
+            timestamp = fields.get("timestamp") or datetime.now().strftime("%d-%m-%Y %H:%M:%S")
+            return Note(record_id, fields["title"], fields.get("content", ""), timestamp)
+        if name == "tasks":
+            return Task(record_id, fields["title"], fields.get("description", ""), fields.get("done", False),
+                        fields.get("priority", "2"), fields.get("due_date", ""))
+        if name == "contacts":
+            return Contact(record_id, fields["name"], fields.get("phone", ""), fields.get("email", ""))
+        if fields.get("type") not in ("доход", "расход"):
+            raise CommandError(f"неизвестный тип записи '{fields.get('type')}'")
+        return FinanceRecord(record_id, fields["type"], fields["amount"], fields.get("category", ""),
+                             fields["date"], fields.get("description", ""))
+    except KeyError as e:
+        raise CommandError(f"не задано поле {e}") from None
+
+
+def collection_name(command):
+    name = command.get("collection")
+    if name not in COLLECTIONS:
+        raise CommandError(f"неизвестная коллекция '{name}'")
+    return name
+
+
+def execute(assistant, command):
+    op = command.get("op")
+    if op == "add":
+        name = collection_name(command)
+        record = make_record(assistant, name, command.get("data", {}))
+        assistant.insert_records(name, [record])
+        return {"id": record.id}
+    if op == "edit":
+        name = collection_name(command)
+        changes = convert_fields(name, command.get("data", {}))
+        if not assistant.edit_records(name, {command["id"]: changes}):
+            raise CommandError(f"запись с ID {command['id']} не найдена")
+        return {"id": command["id"]}
+    if op == "delete":
+        name = collection_name(command)
+        ids = command.get("ids") or [command["id"]]
+        return {"deleted": assistant.delete_records(name, ids)}
+    if op == "import":
+        name = collection_name(command)
+        # Сообщения импорта уходят в stderr, чтобы не смешиваться с результатами
+        with contextlib.redirect_stdout(sys.stderr):
+            counts = getattr(assistant, IMPORTERS[name])(command["file"])
+        if counts is None:
+            raise CommandError(f"не удалось импортировать файл {command['file']}")
+        return {key: counts[key] for key in ("inserted", "updated", "skipped", "rejected")}
+    if op == "report":
+        start = parse_date(command["start"]) if command.get("start") else None
+        end = parse_date(command["end"]) if command.get("end") else None
+        category = command.get("category") or command.get("data", {}).get("category")
+        if category:
+            income, expense = assistant.finance_totals(start, end, category)
+            return {"category": category, "income": income, "expense": expense, "balance": income - expense}
+        _, count, (income, expense), categories = assistant.finance_report(start, end)
+        return {"count": count, "income": income, "expense": expense, "balance": income - expense,
+                "categories": {category: {"income": totals[0], "expense": totals[1]}
+                               for category, totals in categories.items()}}
+    raise CommandError(f"неизвестная команда '{op}'")
+
+
+def run_commands(assistant, lines, out=sys.stdout, atomic=False):
+    # Все команды выполняются в одной транзакции и сохраняются одним вызовом
+    # на коллекцию в конце. По строке JSON с результатом на каждую команду;
+    # при atomic первая ошибка отменяет все изменения.
+    operations = 0
+    errors = 0
+    with assistant.transaction():
+        for number, line in enumerate(lines, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            operations += 1
+            try:
+                command = parse_command(line)
+                result = {"line": number, "ok": True, **execute(assistant, command)}
+            except (CommandError, ValueError, KeyError, TypeError, AttributeError, OSError) as e:
+                errors += 1
+                result = {"line": number, "ok": False, "error": str(e)}
+                if atomic:
+                    out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                    raise
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+    return operations, errors
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Пакетное выполнение команд персонального помощника")
+    parser.add_argument("script", nargs="?", default="-",
+                        help="файл команд (JSONL или текстовые команды), '-' - стандартный ввод")
+    add_storage_arguments(parser)
+    parser.add_argument("--atomic", action="store_true",
+                        help="при первой ошибке отменить все изменения")
+    args = parser.parse_args()
+
+    storage = make_storage(args)
+    assistant = PersonalAssistant(storage, lazy=not args.eager)
+    script = sys.stdin if args.script == "-" else open(args.script, "r", encoding="utf-8")
+    started = time.perf_counter()
+    status = 0
+    try:
+        with script:
+            operations, errors = run_commands(assistant, script, atomic=args.atomic)
+    except Exception as e:
+        operations, errors, status = 0, 1, 1
+        print(f"Изменения отменены: {e}", file=sys.stderr)
+    finally:
+        storage.close()
+    elapsed = time.perf_counter() - started
+    # Итог - в stderr, stdout остается потоком результатов команд
+    summary = {"operations": operations, "errors": errors, "seconds": round(elapsed, 3),
+               "ops_per_sec": round(operations / elapsed) if elapsed else None}
+    print(json.dumps(summary, ensure_ascii=False), file=sys.stderr)
+    sys.exit(status or (1 if errors else 0))
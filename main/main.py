@@ -1,5 +1,144 @@
-from personal_assistant import PersonalAssistant
+import argparse
+import contextlib
+import cProfile
+import io
+import os
+import re
+import time
+
+from personal_assistant import PersonalAssistant, COLLECTIONS
+from storage import BackgroundWriter, JsonStorage, ShardedStorage, SqliteStorage, convert_snapshots, import_json_into
+
+# Имя рабочего пространства становится именем папки, поэтому только буквы, цифры, _ и -
+WORKSPACE_NAME = re.compile(r"[\w-]+")
+
+
+def add_storage_arguments(parser):
+    parser.add_argument("--storage", choices=["json", "sqlite"], default="json",
+                        help="хранилище данных (по умолчанию json)")
+    parser.add_argument("--db", default="assistant.db", help="файл базы SQLite")
+    parser.add_argument("--snapshot-format", choices=["json", "binary"], default="json",
+                        help="формат снимков коллекций для хранилища json (по умолчанию json)")
+    parser.add_argument("--workspace", help="рабочее пространство: данные хранятся в отдельной папке")
+    parser.add_argument("--workspaces-dir", default="workspaces",
+                        help="папка рабочих пространств (по умолчанию workspaces)")
+    parser.add_argument("--shard-finance", action="store_true",
+                        help="хранить финансовые записи по годам, отчеты читают только нужные годы")
+    parser.add_argument("--eager", action="store_true",
+                        help="загрузить все коллекции при запуске, одновременно в нескольких потоках")
+
+
+def data_directory(args, workspace=None):
+    workspace = workspace or args.workspace
+    if not workspace:
+        return "."
+    if not WORKSPACE_NAME.fullmatch(workspace):
+        raise ValueError(f"недопустимое имя рабочего пространства '{workspace}'")
+    return os.path.join(args.workspaces_dir, workspace)
+
+
+def make_storage(args, workspace=None):
+    directory = data_directory(args, workspace)
+    os.makedirs(directory, exist_ok=True)
+    if args.storage == "sqlite":
+        storage = SqliteStorage(os.path.join(directory, args.db))
+    else:
+        storage = JsonStorage(directory, args.snapshot_format)
+    if args.shard_finance:
+        storage = ShardedStorage(storage)
+    return storage
+
+
+def data_files(args):
+    directory = data_directory(args)
+    if args.storage == "sqlite":
+        names = [args.db, args.db + "-wal"]
+    else:
+        names = list(COLLECTIONS) + ["notes_index", "finance_aggregates"]
+        names = ([f"{name}.json" for name in names] + [f"{name}.bin" for name in COLLECTIONS]
+                 + [f"{name}.journal" for name in COLLECTIONS])
+    return [os.path.join(directory, name) for name in names]
+
+
+def evict_from_page_cache(filenames):
+    # Холодный старт: просим ядро выбросить файлы данных из страничного кэша
+    if not hasattr(os, "posix_fadvise"):
+        return False
+    for filename in filenames:
+        if os.path.exists(filename):
+            with open(filename, "rb") as f:
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+    return True
+
+
+def time_to_first_menu(args, lazy):
+    started = time.perf_counter()
+    storage = make_storage(args)
+    with contextlib.redirect_stdout(io.StringIO()):
+        assistant = PersonalAssistant(storage, lazy=lazy)
+        assistant.print_main_menu()
+    elapsed = time.perf_counter() - started
+    storage.close()
+    return elapsed
+
+
+def measure_startup(args):
+    for lazy in (True, False):
+        mode = "ленивая загрузка" if lazy else "полная загрузка"
+        evicted = evict_from_page_cache(data_files(args))
+        cold = time_to_first_menu(args, lazy)
+        warm = time_to_first_menu(args, lazy)
+        cache = "холодный кэш" if evicted else "кэш не сброшен"
+        print(f"{mode}: до первого меню {cold * 1000:.1f} мс ({cache}), "
+              f"{warm * 1000:.1f} мс (теплый кэш)")
+
 
 if __name__ == "__main__":
-    assistant = PersonalAssistant()
-    assistant.main_menu()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Персональный помощник")
+    add_storage_arguments(parser)
+    parser.add_argument("--import-json", action="store_true",
+                        help="перенести данные из JSON-файлов в базу SQLite и выйти")
+    parser.add_argument("--convert-snapshots", action="store_true",
+                        help="пересохранить снимки коллекций в формате --snapshot-format и выйти")
+    parser.add_argument("--sync-writes", action="store_true",
+                        help="сохранять каждое изменение сразу, без фонового потока записи")
+    parser.add_argument("--profile", action="store_true",
+                        help="собирать статистику операций с самого запуска (меню \"Статистика\")")
+    parser.add_argument("--profile-output", help="при выходе сохранить статистику операций в JSON-файл")
+    parser.add_argument("--cprofile", help="запустить под cProfile и при выходе сохранить результат в файл")
+    parser.add_argument("--startup-time", action="store_true",
+                        help="измерить время до первого меню с холодным и теплым кэшем и выйти")
+    args = parser.parse_args()
+
+    if args.startup_time:
+        measure_startup(args)
+    elif args.convert_snapshots:
+        sizes = convert_snapshots({name: cls for name, (cls, attr) in COLLECTIONS.items()}, args.snapshot_format,
+                                  data_directory(args))
+        for name, size in sizes.items():
+            print(f"{name}: снимок {args.snapshot_format}, {size} байт")
+    elif args.import_json:
+        storage = make_storage(args)
+        counts = import_json_into(storage, {name: cls for name, (cls, attr) in COLLECTIONS.items()},
+                                  data_directory(args))
+        for name, count in counts.items():
+            print(f"{name}: перенесено записей - {count}")
+        storage.close()
+    else:
+        storage = make_storage(args)
+        if not args.sync_writes:
+            storage = BackgroundWriter(storage)
+        assistant = PersonalAssistant(storage, lazy=not args.eager)
+        if args.profile or args.profile_output:
+            assistant.enable_profiling()
+        if args.cprofile:
+            profile = cProfile.Profile()
+            try:
+                profile.runcall(assistant.main_menu)
+            finally:
+                profile.dump_stats(args.cprofile)
+        else:
+            assistant.main_menu()
+        storage.close()
+        if args.profile_output:
+            assistant.dump_stats(args.profile_output)
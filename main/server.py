@@ -0,0 +1,203 @@
+import argparse
+import asyncio
+import json
+import signal
+import sys
+import traceback
+from urllib.parse import parse_qs, urlsplit
+
+from personal_assistant import PersonalAssistant, COLLECTIONS
+from storage import BackgroundWriter
+from batch import CommandError, execute
+from main import add_storage_arguments, make_storage
+
+# Размер страницы списка по умолчанию и максимальный
+PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           500: "Internal Server Error"}
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class AssistantServer:
+    # HTTP/JSON API поверх PersonalAssistant. Все обработчики выполняются в
+    # цикле событий: чтение идет из памяти и не ждет диска, изменения
+    # выполняются по одному под write_lock рабочего пространства, а на диск
+    # их пачками сбрасывает BackgroundWriter в своем потоке.
+    #
+    # Пути без префикса относятся к рабочему пространству по умолчанию,
+    # /workspaces/<имя>/... - к указанному; каждое пространство открывается
+    # при первом запросе и хранит данные в своей папке.
+    #
+    #   GET    /                        размеры коллекций
+    #   GET    /report?start=&end=      итоги по финансам (даты ДД-ММ-ГГГГ)
+    #   GET    /<коллекция>?offset=&limit=&q=   страница записей или поиск (notes, contacts)
+    #   GET    /<коллекция>/<id>
+    #   POST   /<коллекция>             добавить запись, тело - поля записи
+    #   PATCH  /<коллекция>/<id>        изменить поля (PUT - то же самое)
+    #   DELETE /<коллекция>/<id>
+
+    def __init__(self, open_workspace):
+        # open_workspace(имя или None) -> PersonalAssistant
+        self.open_workspace = open_workspace
+        self.assistants = {}
+        self.write_locks = {}
+
+    def workspace(self, name):
+        if name not in self.assistants:
+            try:
+                self.assistants[name] = self.open_workspace(name)
+            except ValueError as e:
+                raise HttpError(404, str(e))
+            self.write_locks[name] = asyncio.Lock()
+        return self.assistants[name], self.write_locks[name]
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                length = int(headers.get("content-length") or 0)
+                body = await reader.readexactly(length) if length else b""
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                    status, payload = await self.dispatch(method, target, body)
+                except HttpError as e:
+                    status, payload, version = e.status, {"error": str(e)}, "HTTP/1.1"
+                except (CommandError, ValueError, KeyError, TypeError) as e:
+                    status, payload, version = 400, {"error": str(e)}, "HTTP/1.1"
+                except Exception:
+                    # Ошибка в самом помощнике: клиент получает ответ, подробности - в журнал сервера
+                    traceback.print_exc(file=sys.stderr)
+                    status, payload, version = 500, {"error": "внутренняя ошибка сервера"}, "HTTP/1.1"
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, target, body):
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        parts = [part for part in url.path.split("/") if part]
+        workspace = None
+        if parts[:1] == ["workspaces"] and len(parts) > 1:
+            workspace = parts[1]
+            parts = parts[2:]
+        assistant, write_lock = self.workspace(workspace)
+        if not parts:
+            if method != "GET":
+                raise HttpError(405, "метод не поддерживается")
+            return 200, {name: len(assistant.collection(name)) for name in COLLECTIONS}
+        if parts == ["report"]:
+            if method != "GET":
+                raise HttpError(405, "метод не поддерживается")
+            return 200, execute(assistant, {"op": "report", **query})
+        name = parts[0]
+        if name not in COLLECTIONS or len(parts) > 2:
+            raise HttpError(404, "не найдено")
+        if len(parts) == 1:
+            if method == "GET":
+                return 200, self.list_records(assistant, name, query)
+            if method == "POST":
+                async with write_lock:
+                    return 201, execute(assistant, {"op": "add", "collection": name,
+                                                         "data": self.parse_body(body)})
+            raise HttpError(405, "метод не поддерживается")
+        record_id = int(parts[1])
+        if method == "GET":
+            record = assistant.get_record(name, record_id)
+            if record is None:
+                raise HttpError(404, f"запись с ID {record_id} не найдена")
+            return 200, record.to_dict()
+        async with write_lock:
+            if method in ("PATCH", "PUT"):
+                if assistant.get_record(name, record_id) is None:
+                    raise HttpError(404, f"запись с ID {record_id} не найдена")
+                return 200, execute(assistant, {"op": "edit", "collection": name, "id": record_id,
+                                                     "data": self.parse_body(body)})
+            if method == "DELETE":
+                result = execute(assistant, {"op": "delete", "collection": name, "id": record_id})
+                if not result["deleted"]:
+                    raise HttpError(404, f"запись с ID {record_id} не найдена")
+                return 200, result
+        raise HttpError(405, "метод не поддерживается")
+
+    def parse_body(self, body):
+        data = json.loads(body or b"{}")
+        if not isinstance(data, dict):
+            raise HttpError(400, "тело запроса должно быть объектом JSON")
+        return data
+
+    def list_records(self, assistant, name, query):
+        limit = min(int(query.get("limit", PAGE_SIZE)), MAX_PAGE_SIZE)
+        if "q" in query and name in ("notes", "contacts"):
+            if name == "notes":
+                found = assistant.search_notes(query["q"], limit)
+            else:
+                found = assistant.search_contact(query["q"], limit)
+            return {"total": len(found), "items": [record.to_dict() for record in found]}
+        items = assistant.collection(name)
+        offset = int(query.get("offset", 0))
+        return {"total": len(items), "items": [record.to_dict() for record in items[offset:offset + limit]]}
+
+
+async def serve(server, host, port):
+    listener = await asyncio.start_server(server.handle, host, port)
+    # SIGINT и SIGTERM останавливают сервер штатно, с сохранением накопленных изменений
+    stopped = asyncio.Event()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal_number, stopped.set)
+        except NotImplementedError:  # Windows: остается KeyboardInterrupt
+            pass
+    print(f"Сервер запущен на http://{host}:{port}/", flush=True)
+    async with listener:
+        await stopped.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HTTP/JSON API персонального помощника")
+    parser.add_argument("--host", default="127.0.0.1", help="адрес (по умолчанию 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8080, help="порт (по умолчанию 8080)")
+    add_storage_arguments(parser)
+    args = parser.parse_args()
+
+    def open_workspace(name):
+        # Коллекции загружаются при первом обращении; отчеты по финансам,
+        # разделенным по годам, читают только нужные годы
+        return PersonalAssistant(BackgroundWriter(make_storage(args, name)), lazy=not args.eager)
+
+    server = AssistantServer(open_workspace)
+    server.workspace(None)
+    try:
+        asyncio.run(serve(server, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for assistant in server.assistants.values():
+            assistant.save_views()
+            assistant.storage.close()
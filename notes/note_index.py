@@ -0,0 +1,132 @@
+import math
+import re
+import zlib
+from bisect import bisect_left
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Слова из заголовка весят больше слов из текста
+TITLE_WEIGHT = 3
+
+
+def tokenize(text):
+    # casefold корректно приводит к нижнему регистру и кириллицу; ё и е не различаем
+    return TOKEN_PATTERN.findall(text.casefold().replace("ё", "е"))
+
+
+def note_checksum(note):
+    return zlib.crc32(f"{note.title}\0{note.content}".encode("utf-8"))
+
+
+class NoteIndex:
+    # Инвертированный индекс по заголовкам и текстам заметок:
+    # слово -> {id заметки: вес}. Поиск по префиксам слов идет через
+    # отсортированный словарь и bisect, результаты ранжируются по tf-idf.
+
+    def __init__(self, notes=()):
+        self.postings = {}
+        self.documents = {}
+        self.checksums = {}
+        self.vocabulary = None
+        for note in notes:
+            self.add(note)
+
+    def __len__(self):
+        return len(self.documents)
+
+    def add(self, note):
+        self.remove(note.id)
+        weights = {}
+        for token in tokenize(note.title):
+            weights[token] = weights.get(token, 0) + TITLE_WEIGHT
+        for token in tokenize(note.content):
+            weights[token] = weights.get(token, 0) + 1
+        for token, weight in weights.items():
+            if token not in self.postings:
+                self.postings[token] = {}
+                self.vocabulary = None
+            self.postings[token][note.id] = weight
+        self.documents[note.id] = list(weights)
+        self.checksums[note.id] = note_checksum(note)
+
+    def remove(self, note_id):
+        tokens = self.documents.pop(note_id, None)
+        self.checksums.pop(note_id, None)
+        if tokens is None:
+            return
+        for token in tokens:
+            posting = self.postings[token]
+            del posting[note_id]
+            if not posting:
+                del self.postings[token]
+                self.vocabulary = None
+
+    def expand(self, prefix):
+        if self.vocabulary is None:
+            self.vocabulary = sorted(self.postings)
+        position = bisect_left(self.vocabulary, prefix)
+        while position < len(self.vocabulary) and self.vocabulary[position].startswith(prefix):
+            yield self.vocabulary[position]
+            position += 1
+
+    def search(self, query, limit=20):
+        # Каждое слово запроса - префикс; в результат попадают заметки, где есть все слова
+        terms = tokenize(query)
+        if not terms:
+            return []
+        total = len(self.documents)
+        scores = None
+        for term in terms:
+            term_scores = {}
+            for token in self.expand(term):
+                posting = self.postings[token]
+                idf = math.log(1 + total / len(posting))
+                # Точное совпадение слова ценится выше совпадения по префиксу
+                boost = 1.0 if token == term else 0.5
+                for note_id, weight in posting.items():
+                    score = weight * idf * boost
+                    if score > term_scores.get(note_id, 0.0):
+                        term_scores[note_id] = score
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {note_id: score + term_scores[note_id]
+                          for note_id, score in scores.items() if note_id in term_scores}
+            if not scores:
+                return []
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return [note_id for note_id, _ in ranked[:limit]]
+
+    def sync(self, notes):
+        # Переиндексировать только заметки, изменившиеся с момента сохранения индекса
+        current = set()
+        changed = 0
+        for note in notes:
+            current.add(note.id)
+            if self.checksums.get(note.id) != note_checksum(note):
+                self.add(note)
+                changed += 1
+        for note_id in [note_id for note_id in self.documents if note_id not in current]:
+            self.remove(note_id)
+            changed += 1
+        return changed
+
+    def to_dict(self):
+        return {
+            "postings": {token: {str(note_id): weight for note_id, weight in posting.items()}
+                         for token, posting in self.postings.items()},
+            "checksums": {str(note_id): checksum for note_id, checksum in self.checksums.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        index = cls()
+        for token, posting in data["postings"].items():
+            posting = {int(note_id): weight for note_id, weight in posting.items()}
+            index.postings[token] = posting
+            for note_id in posting:
+                index.documents.setdefault(note_id, []).append(token)
+        index.checksums = {int(note_id): checksum for note_id, checksum in data["checksums"].items()}
+        for note_id in index.checksums:
+            index.documents.setdefault(note_id, [])
+        return index
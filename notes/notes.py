@@ -1,6 +1,8 @@
 from datetime import datetime, date
 
 class Note:
+    __slots__ = ("id", "title", "content", "timestamp")
+
     def __init__(self, id, title, content, timestamp):
         self.id = id
         self.title = title
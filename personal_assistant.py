@@ -1,115 +1,545 @@
-import json
 import csv
+import json
+import os
+import sys
+import time
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, date
+from itertools import islice
+from operator import attrgetter
+
+try:
+    import resource
+except ImportError:  # нет в Windows
+    resource = None
 
 from notes import Note
-from tasks import Task
+from note_index import NoteIndex
+from tasks import Task, PRIORITY_NAMES, priority_rank, parse_due_date
+from agenda import TaskAgenda
 from contacts import Contact
-from finance import FinanceRecord
+from contact_index import ContactIndex, normalize_name
+from dedup import find_duplicates, DUPLICATE_THRESHOLD
+from finance import FinanceRecord, parse_date
+from aggregates import FinanceAggregates, records_checksum
+from date_index import FinanceDateIndex
+from ledger import FinanceLedger, HAS_NUMPY
+from storage import JsonStorage, record_fields
+from export import export_all, write_csv_pages, EXPORT_BATCH_SIZE
+from fingerprints import FINGERPRINTS, RecordFingerprints
+from cursor import Cursor, PAGE_SIZE
+from calculator import Calculator
+from profiling import Profiler
+
+# Коллекции: имя -> (класс записи, атрибут PersonalAssistant)
+COLLECTIONS = {
+    "notes": (Note, "notes"),
+    "tasks": (Task, "tasks"),
+    "contacts": (Contact, "contacts"),
+    "finance": (FinanceRecord, "finance_records"),
+}
+
+# Через сколько изменений заметок поисковый индекс сохраняется на диск
+NOTE_INDEX_SAVE_EVERY = 100
+
+# Сколько контактов показывать при поиске по мере ввода
+LIVE_SEARCH_LIMIT = 10
+
+# Сколько строк импортируемого CSV сохраняется за один раз
+IMPORT_CHUNK_SIZE = 10000
+
+# Сколько частей финансов (годов) читается одновременно при отчете
+FINANCE_SHARD_WORKERS = 8
+
+# Сколько коллекций читается одновременно при полной загрузке
+LOAD_WORKERS = 4
+
+# Операции, которые замеряет профилировщик (enable_profiling)
+PROFILED_OPERATIONS = (
+    "load_collection", "generate_report", "finance_report",
+    "import_notes_from_csv", "import_tasks_from_csv", "import_contacts_from_csv",
+    "import_finance_records_from_csv", "export_notes_to_csv", "export_tasks_to_csv",
+    "export_contacts_to_csv", "export_finance_records_to_csv", "export_all_data",
+)
+# Операции в памяти: замеряется только время
+PROFILED_MEMORY_OPERATIONS = (
+    "insert_records", "edit_records", "delete_records", "search_notes", "search_contact",
+    "find_duplicate_contacts",
+)
+STORAGE_OPERATIONS = (
+    "load", "apply", "save", "load_meta", "save_meta", "load_shard", "write_pending",
+    "load_json", "load_binary", "save_json", "read_journal",
+)
+
+# Сколько ближайших задач показывать в повестке
+AGENDA_LIMIT = 10
+
+# Сколько записей на одной странице при просмотре
+VIEW_PAGE_SIZE = 20
+
+# Порядки обхода коллекций для cursor(): имя -> ключ сортировки (с id для однозначности)
+SORT_KEYS = {
+    "notes": {"id": attrgetter("id")},
+    "tasks": {"id": attrgetter("id"), "due_date": lambda task: (task.due_date or date.max, task.id)},
+    "contacts": {"id": attrgetter("id"), "name": lambda contact: (normalize_name(contact.name), contact.id)},
+    "finance": {"id": attrgetter("id"), "date": lambda record: (record.date.toordinal(), record.id)},
+}
+
+
+# Строки списков при просмотре
+def note_line(note):
+    return f"ID: {note.id}, Заголовок: {note.title}, Дата: {note.timestamp}"
+
+
+def task_line(task):
+    priority_str = PRIORITY_NAMES[priority_rank(task.priority)]
+    due_str = task.due_date.strftime("%d-%m-%Y") if task.due_date else "без срока"
+    return (f"ID: {task.id}, Заголовок: {task.title}, Статус: {'Выполнено' if task.done else 'Не выполнено'}, "
+            f"Приоритет: {priority_str}, Срок: {due_str}")
+
+
+def contact_line(contact):
+    return f"ID: {contact.id}, Имя: {contact.name}, Телефон: {contact.phone}, Email: {contact.email}"
+
+
+def finance_line(record):
+    return (f"ID: {record.id}, Тип: {record.type}, Сумма: {record.amount}, Категория: {record.category}, "
+            f"Дата: {record.date}")
+
+
+def collection_property(name):
+    # Атрибуты notes, tasks, contacts и finance_records загружают коллекцию при первом обращении
+    def getter(self):
+        return self.collection(name)
+
+    def setter(self, items):
+        self.data[name] = items
+        self.stale.discard(name)
+
+    return property(getter, setter)
+
+
+class CollectionItems:
+    # Вся коллекция для сворачивания журнала: хранилищу нужны длина и обход,
+    # а список собирается из индекса (один раз), только когда журнал действительно сворачивается
+
+    def __init__(self, index):
+        self.index = index
+        self.items = None
+
+    def __len__(self):
+        return len(self.index) if self.items is None else len(self.items)
+
+    def __iter__(self):
+        if self.items is None:
+            self.items = list(self.index.values())
+        return iter(self.items)
+
 
 class PersonalAssistant:
-    def __init__(self):
-        self.notes = []
-        self.tasks = []
-        self.contacts = []
-        self.finance_records = []
-        self.load_data()
-
-    def load_data(self):
-        self.notes = self.load_json("notes.json", Note)
-        self.tasks = self.load_json("tasks.json", Task)
-        self.contacts = self.load_json("contacts.json", Contact)
-        self.finance_records = self.load_json("finance.json", FinanceRecord)
-
-    def save_data(self):
-        self.save_json("notes.json", self.notes)
-        self.save_json("tasks.json", self.tasks)
-        self.save_json("contacts.json", self.contacts)
-        self.save_json("finance.json", self.finance_records)
-
-    def load_json(self, filename, cls):
+    notes = collection_property("notes")
+    tasks = collection_property("tasks")
+    contacts = collection_property("contacts")
+    finance_records = collection_property("finance")
+
+    def __init__(self, storage=None, use_ledger=True, lazy=True):
+        self.data = {}
+        self.index = {name: {} for name in COLLECTIONS}
+        # Коллекции, у которых записи заменялись или удалялись: основное хранилище -
+        # индекс по id, а список пересобирается из него при следующем обращении
+        self.stale = set()
+        self.next_ids = {name: 1 for name in COLLECTIONS}
+        self.use_ledger = use_ledger and HAS_NUMPY
+        self.ledger = None
+        self.date_index = FinanceDateIndex()
+        self.aggregates = FinanceAggregates()
+        self.note_index = NoteIndex()
+        self.note_index_changes = 0
+        # Во время импорта индекс заметок сохраняется один раз в конце, а не каждые NOTE_INDEX_SAVE_EVERY изменений
+        self.autosave_views = True
+        self.contact_index = None
+        # Загруженные для отчетов годы финансов, пока коллекция не загружена целиком
+        self.finance_shards = {}
+        # Отпечатки записей для импорта без повторов, строятся при первом импорте
+        self.fingerprints = {}
+        self.fingerprints_changed = set()
+        # Коллекции с сохраненными отпечатками (служебная запись "fingerprints"), читается при первом изменении
+        self.fingerprints_saved = None
+        # Отсортированные копии коллекций для cursor(): {(коллекция, порядок): список}
+        self.sorted_views = {}
+        # Изменения, отложенные до конца transaction(): {коллекция: {id: (op, запись или id)}}
+        self.pending = None
+        self.agenda = TaskAgenda()
+        self.calc = Calculator(
+            variables={
+                "доходы": lambda: self.finance_value(0),
+                "расходы": lambda: self.finance_value(1),
+                "баланс": lambda: self.finance_value(0) - self.finance_value(1),
+            },
+            functions={
+                "доходы": lambda key: self.finance_value(0, key),
+                "расходы": lambda key: self.finance_value(1, key),
+                "баланс": lambda key: self.finance_value(0, key) - self.finance_value(1, key),
+            })
+        self.storage = storage or JsonStorage()
+        self.profiler = None
+        if not lazy:
+            self.load_data()
+
+    def load_data(self, workers=None):
+        # Файлы коллекций читаются одновременно в потоках: чтение с диска
+        # (и запросы SQLite) идут параллельно, разбор - по очереди из-за GIL.
+        # Индексы и представления строятся после, в основном потоке
+        names = [name for name in COLLECTIONS if name not in self.data]
+        workers = min(len(names), workers or LOAD_WORKERS)
+        if workers <= 1:
+            for name in names:
+                self.load_collection(name)
+            return
+        with self.storage.reading() as storage, ThreadPoolExecutor(max_workers=workers) as pool:
+            loaded = list(pool.map(lambda name: storage.load(name, COLLECTIONS[name][0]), names))
+        for name, items in zip(names, loaded):
+            self.set_collection(name, items)
+
+    def load_collection(self, name):
+        cls, attr = COLLECTIONS[name]
+        self.set_collection(name, self.storage.load(name, cls))
+
+    def set_collection(self, name, items):
+        self.data[name] = items
+        self.stale.discard(name)
+        self.rebuild_index(name)
+        self.build_views(name)
+
+    def collection(self, name):
+        if name not in self.data:
+            self.load_collection(name)
+        elif name in self.stale:
+            self.data[name] = list(self.index[name].values())
+            self.stale.discard(name)
+        return self.data[name]
+
+    def records(self, name):
+        # Словарь id -> запись; список коллекции при этом не пересобирается
+        if name not in self.data:
+            self.load_collection(name)
+        return self.index[name]
+
+    def iter_collection(self, name, page_size=1000):
+        # Постраничный обход: загруженная коллекция отдается срезами,
+        # незагруженная читается из хранилища по страницам, не попадая в память целиком
+        if name in self.data:
+            items = self.collection(name)
+            for start in range(0, len(items), page_size):
+                yield items[start:start + page_size]
+        else:
+            yield from self.storage.iter_pages(name, COLLECTIONS[name][0], page_size)
+
+    def log_changes(self, name, entries):
+        # entries: список пар (op, запись) для "put" или (op, id) для "delete"
+        if self.pending is not None:
+            pending = self.pending.setdefault(name, {})
+            for op, value in entries:
+                pending[value.id if op == "put" else value] = (op, value)
+            return
+        cls, attr = COLLECTIONS[name]
+        self.storage.apply(name, cls, entries, CollectionItems(self.index[name]))
+        if name == "finance":
+            self.storage.save_meta("finance_aggregates", self.aggregates.to_dict())
+
+    @contextmanager
+    def transaction(self):
+        # Изменения внутри блока сохраняются в конце одним вызовом apply на
+        # коллекцию (последняя операция по каждому id). При исключении они
+        # отбрасываются: затронутые коллекции перечитываются из хранилища,
+        # а вместе с ними заново строятся индекс по id и все представления.
+        if self.pending is not None:
+            yield
+            return
+        self.pending = {}
         try:
-            with open(filename, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                for item in data:
-                    if not all(key in item for key in cls.__init__.__code__.co_varnames[1:]):
-                        raise ValueError(f"Некорректная структура данных в файле {filename}")
-                return [cls(**item) for item in data]
-        except (FileNotFoundError, ValueError) as e:
-            print(f"Ошибка при загрузке данных из {filename}: {e}")
-            return []
-
-    def save_json(self, filename, data):
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump([item.to_dict() for item in data], f, ensure_ascii=False, indent=4)
+            yield
+        except BaseException:
+            pending, self.pending = self.pending, None
+            for name in pending:
+                self.load_collection(name)
+            self.calc.invalidate()
+            raise
+        pending, self.pending = self.pending, None
+        for name, entries in pending.items():
+            self.log_changes(name, list(entries.values()))
+        self.save_views()
+        for name in pending:
+            if name in self.fingerprints:
+                self.save_fingerprints(name)
+
+    # Индекс по id. Словарь index[name] хранит записи в том же порядке, что и список коллекции
+    def rebuild_index(self, name):
+        cls, attr = COLLECTIONS[name]
+        self.index[name] = {item.id: item for item in getattr(self, attr)}
+        self.next_ids[name] = max(self.index[name], default=0) + 1
+
+    def new_id(self, name):
+        self.records(name)
+        item_id = self.next_ids[name]
+        self.next_ids[name] += 1
+        return item_id
+
+    # Производные представления коллекций, которые обновляются при каждом изменении
+    def build_views(self, name):
+        self.fingerprints.pop(name, None)
+        self.discard_sorted_views(name)
+        if name == "contacts":
+            # Индекс контактов строится при первом поиске
+            self.contact_index = None
+        if name == "tasks":
+            self.agenda = TaskAgenda(self.tasks)
+        if name == "notes":
+            data = self.storage.load_meta("notes_index")
+            self.note_index = NoteIndex.from_dict(data) if data is not None else NoteIndex()
+            # Сохраненный индекс досинхронизируется по контрольным суммам заметок
+            if self.note_index.sync(self.notes) or data is None:
+                self.save_views()
+        if name != "finance":
+            return
+        self.finance_shards = {}
+        self.date_index = FinanceDateIndex(self.finance_records)
+        if self.use_ledger:
+            self.ledger = FinanceLedger(self.finance_records)
+        data = self.storage.load_meta("finance_aggregates")
+        # Итоги могли сохраниться не для тех записей (сбой между записью журнала
+        # и итогов, правка файлов): им верим, только если сходится контрольная сумма
+        if (data is not None and data.get("count") == len(self.finance_records)
+                and data.get("checksum") == records_checksum(self.finance_records)):
+            self.aggregates = FinanceAggregates.from_dict(data)
+        else:
+            self.aggregates = FinanceAggregates(self.finance_records)
+            self.storage.save_meta("finance_aggregates", self.aggregates.to_dict())
+
+    def discard_views(self, name, records):
+        # Вызывается до изменения или удаления записей, пока у них старые значения
+        fingerprints = self.fingerprints.get(name)
+        if fingerprints is not None:
+            for record in records:
+                fingerprints.remove(record.id)
+        if name == "finance":
+            for record in records:
+                self.aggregates.remove(record)
+
+    def update_views(self, name, records=(), deleted=()):
+        if records or deleted:
+            self.discard_sorted_views(name)
+            self.fingerprints_invalidate(name)
+            fingerprints = self.fingerprints.get(name)
+            if fingerprints is not None:
+                for record in records:
+                    fingerprints.add(record)
+                for record_id in deleted:
+                    fingerprints.remove(record_id)
+        if name == "notes":
+            for note in records:
+                self.note_index.add(note)
+            for note_id in deleted:
+                self.note_index.remove(note_id)
+            self.note_index_changes += len(records) + len(deleted)
+            if self.note_index_changes >= NOTE_INDEX_SAVE_EVERY and self.pending is None and self.autosave_views:
+                self.save_views()
+        if name == "contacts" and self.contact_index is not None:
+            for contact in records:
+                self.contact_index.put(contact)
+            for contact_id in deleted:
+                self.contact_index.remove(contact_id)
+        if name == "tasks":
+            for task in records:
+                self.agenda.put(task)
+            for task_id in deleted:
+                self.agenda.remove(task_id)
+        if name != "finance":
+            return
+        self.calc.invalidate()
+        for record in records:
+            self.aggregates.add(record)
+        self.date_index.extend(records)
+        for record_id in deleted:
+            self.date_index.remove(record_id)
+        if self.ledger is not None:
+            self.ledger.extend(records)
+            for record_id in deleted:
+                self.ledger.remove(record_id)
+
+    def discard_sorted_views(self, name):
+        for key in [key for key in self.sorted_views if key[0] == name]:
+            del self.sorted_views[key]
+
+    def save_views(self):
+        if "notes" not in self.data:
+            return
+        self.storage.save_meta("notes_index", self.note_index.to_dict())
+        self.note_index_changes = 0
+
+    # Постраничный просмотр
+    def sorted_view(self, name, order="id"):
+        # Финансы по дате уже упорядочены в индексе по дате; коллекция, записи
+        # которой идут по возрастанию id (обычно так и есть), отдается по id
+        # без копии; остальные порядки сортируются при первом обращении и
+        # хранятся до изменения коллекции
+        items = self.collection(name)
+        if name == "finance" and order == "date":
+            return self.date_index.records
+        view = self.sorted_views.get((name, order))
+        if view is None:
+            if order == "id" and all(a.id < b.id for a, b in zip(items, islice(items, 1, None))):
+                view = items
+            else:
+                view = sorted(items, key=SORT_KEYS[name][order])
+            self.sorted_views[(name, order)] = view
+        return view
+
+    def cursor(self, name, order="id", reverse=False, page_size=PAGE_SIZE, after=None, offset=0, where=None,
+               bounds=None):
+        # Курсор по коллекции в порядке order (см. SORT_KEYS); after - cursor.last_key
+        # предыдущего курсора, чтобы продолжить с того же места
+        return Cursor(self.sorted_view(name, order), SORT_KEYS[name][order], page_size, reverse, after, offset,
+                      where, bounds)
+
+    def show_pages(self, cursor, line):
+        # Каждая страница выводится одной записью в stdout; следующая - по Enter
+        shown = 0
+        for page in cursor.pages():
+            sys.stdout.write("".join(line(item) + "\n" for item in page))
+            shown += len(page)
+            if not cursor.has_more():
+                break
+            try:
+                answer = input(f"Показано: {shown}. Enter - следующая страница, любой другой ввод - выход: ")
+            except EOFError:
+                break
+            if answer:
+                break
+
+    def get_record(self, name, item_id):
+        return self.records(name).get(item_id)
+
+    def insert_records(self, name, records):
+        # Запись с уже существующим id заменяет старую на ее месте
+        records = list({record.id: record for record in records}.values())
+        index = self.records(name)
+        replaced = [index[record.id] for record in records if record.id in index]
+        self.discard_views(name, replaced)
+        if replaced:
+            self.stale.add(name)
+        items = self.data[name]
+        for record in records:
+            if record.id not in index and name not in self.stale:
+                items.append(record)
+            index[record.id] = record
+            if record.id >= self.next_ids[name]:
+                self.next_ids[name] = record.id + 1
+        self.update_views(name, records)
+        self.log_changes(name, [("put", record) for record in records])
+
+    def edit_records(self, name, changes):
+        # changes: {id: {поле: новое значение}}, None не меняет поле.
+        # Имена полей проверяются до изменения представлений: записи в них
+        # сначала вычитаются со старыми значениями
+        allowed = set(record_fields(COLLECTIONS[name][0])) - {"id"}
+        for fields in changes.values():
+            unknown = sorted(set(fields) - allowed)
+            if unknown:
+                raise ValueError(f"неизвестные поля: {', '.join(unknown)}")
+        index = self.records(name)
+        edited = []
+        for item_id, fields in changes.items():
+            record = index.get(item_id)
+            if record is None:
+                continue
+            fields = {field: value for field, value in fields.items() if value is not None}
+            old = {field: getattr(record, field) for field in fields}
+            self.discard_views(name, [record])
+            try:
+                for field, value in fields.items():
+                    setattr(record, field, value)
+            except Exception:
+                # Неверное значение: запись и представления возвращаются к прежнему состоянию
+                for field, value in old.items():
+                    setattr(record, field, value)
+                self.update_views(name, [record])
+                raise
+            edited.append(record)
+        self.update_views(name, edited)
+        self.log_changes(name, [("put", record) for record in edited])
+        return [record.id for record in edited]
+
+    def delete_records(self, name, ids):
+        index = self.records(name)
+        removed = [index.pop(item_id) for item_id in ids if item_id in index]
+        if removed:
+            self.stale.add(name)
+            self.discard_views(name, removed)
+            removed = [record.id for record in removed]
+            self.update_views(name, deleted=removed)
+            self.log_changes(name, [("delete", item_id) for item_id in removed])
+        return removed
 
     # Заметки
     def add_note(self, title, content):
-        note_id = len(self.notes) + 1
+        note_id = self.new_id("notes")
         timestamp = datetime.now().strftime("%d-%m-%Y %H:%M:%S")
-        self.notes.append(Note(note_id, title, content, timestamp))
-        self.save_data()
+        self.insert_records("notes", [Note(note_id, title, content, timestamp)])
 
     def view_notes(self):
-        for note in self.notes:
-            print(f"ID: {note.id}, Заголовок: {note.title}, Дата: {note.timestamp}")
+        self.show_pages(self.cursor("notes", page_size=VIEW_PAGE_SIZE), note_line)
 
     def view_note_details(self, note_id):
-        for note in self.notes:
-            if note.id == note_id:
-                print(f"ID: {note.id}")
-                print(f"Заголовок: {note.title}")
-                print(f"Содержимое: {note.content}")
-                print(f"Дата: {note.timestamp}")
-                return
-        print(f"Заметка с ID {note_id} не найдена.")
+        note = self.get_record("notes", note_id)
+        if note is None:
+            print(f"Заметка с ID {note_id} не найдена.")
+            return
+        print(f"ID: {note.id}")
+        print(f"Заголовок: {note.title}")
+        print(f"Содержимое: {note.content}")
+        print(f"Дата: {note.timestamp}")
 
     def edit_note(self, note_id, new_title, new_content):
-        for note in self.notes:
-            if note.id == note_id:
-                if new_title:
-                    note.title = new_title
-                if new_content:
-                    note.content = new_content
-                self.save_data()
-                print(f"Заметка с ID {note_id} успешно отредактирована.")
-                return
-        print(f"Заметка с ID {note_id} не найдена.")
+        # Пустая строка - оставить поле как есть
+        if self.edit_records("notes", {note_id: {"title": new_title or None, "content": new_content or None}}):
+            print(f"Заметка с ID {note_id} успешно отредактирована.")
+        else:
+            print(f"Заметка с ID {note_id} не найдена.")
 
     def delete_note(self, note_id):
-        for i, note in enumerate(self.notes):
-            if note.id == note_id:
-                del self.notes[i]
-                self.save_data()
-                print(f"Заметка с ID {note_id} успешно удалена.")
-                return
-        print(f"Заметка с ID {note_id} не найдена.")
+        if self.delete_records("notes", [note_id]):
+            print(f"Заметка с ID {note_id} успешно удалена.")
+        else:
+            print(f"Заметка с ID {note_id} не найдена.")
+
+    def search_notes(self, query, limit=20):
+        self.collection("notes")
+        return [self.index["notes"][note_id] for note_id in self.note_index.search(query, limit)]
 
     def export_notes_to_csv(self, file_name):
-        with open(file_name, 'w', encoding='utf-8', newline='') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(['id', 'title', 'content', 'timestamp'])
-            for note in self.notes:
-                writer.writerow([note.id, note.title, note.content, note.timestamp])
+        self.export_collection("notes", file_name)
         print(f"Заметки успешно экспортированы в {file_name}.")
 
-    def import_notes_from_csv(self, file_name):
+    def import_notes_from_csv(self, file_name, upsert=True):
         try:
-            with open(file_name, 'r', encoding='utf-8') as csvfile:
-                reader = csv.reader(csvfile)
-                next(reader)  # Пропустить заголовок
-                for row in reader:
-                    note_id = int(row[0])
-                    title = row[1]
-                    content = row[2]
-                    timestamp = row[3]
-                    self.notes.append(Note(note_id, title, content, timestamp))
-            self.save_data()
-            print(f"Заметки успешно импортированы из {file_name}.")
+            counts = self.import_csv("notes", file_name, self.note_from_row, upsert)
         except FileNotFoundError:
             print(f"Файл {file_name} не найден.")
+            return None
         except Exception as e:
             print(f"Ошибка при импорте заметок из файла {file_name}: {e}")
+            return None
+        print(f"Заметки успешно импортированы из {file_name}.")
+        self.print_import_counts(counts)
+        return counts
+
+    def note_from_row(self, row):
+        # Колонки: id, title, content, timestamp; пустой id - новая заметка
+        note_id = int(row[0]) if row[0] else None
+        return Note(note_id, row[1], row[2], row[3])
 
     def notes_menu(self):
         while True:
@@ -129,80 +559,74 @@ class PersonalAssistant:
 
     # Задачи
     def add_task(self, title, description, priority, due_date):
-        task_id = len(self.tasks) + 1
-        self.tasks.append(Task(task_id, title, description, False, priority, due_date))
-        self.save_data()
-
-    def view_tasks(self):
-        priority_mapping_reverse = {
-            '1': "Высокий",
-            '2': "Средний",
-            '3': "Низкий"
-        }
-        for task in self.tasks:
-            priority_str = priority_mapping_reverse.get(task.priority, "Средний")
-            print(
-                f"ID: {task.id}, Заголовок: {task.title}, Статус: {'Выполнено' if task.done else 'Не выполнено'}, Приоритет: {priority_str}")
+        task_id = self.new_id("tasks")
+        self.insert_records("tasks", [Task(task_id, title, description, False, priority, due_date)])
+
+    def view_tasks(self, tasks=None):
+        if tasks is None:
+            cursor = self.cursor("tasks", page_size=VIEW_PAGE_SIZE)
+        else:
+            cursor = Cursor(tasks, page_size=VIEW_PAGE_SIZE)
+        self.show_pages(cursor, task_line)
+
+    # Повестка: запросы к куче невыполненных задач по сроку и приоритету
+    def agenda_tasks(self, task_ids):
+        return [self.index["tasks"][task_id] for task_id in task_ids]
+
+    def upcoming_tasks(self, count=AGENDA_LIMIT, today=None):
+        self.collection("tasks")
+        return self.agenda_tasks(self.agenda.upcoming(count, today or date.today()))
+
+    def overdue_tasks(self, today=None, priority=None):
+        self.collection("tasks")
+        return self.agenda_tasks(self.agenda.overdue(today, priority))
+
+    def tasks_due_today(self, today=None):
+        self.collection("tasks")
+        return self.agenda_tasks(self.agenda.due_on(today))
 
     def mark_task_done(self, task_id):
-        for task in self.tasks:
-            if task.id == task_id:
-                task.done = True
-                self.save_data()
-                print(f"Задача с ID {task_id} отмечена как выполненная.")
-                return
-        print(f"Задача с ID {task_id} не найдена.")
+        if self.edit_records("tasks", {task_id: {"done": True}}):
+            print(f"Задача с ID {task_id} отмечена как выполненная.")
+        else:
+            print(f"Задача с ID {task_id} не найдена.")
 
     def edit_task(self, task_id, new_title, new_description, new_priority, new_due_date):
-        for task in self.tasks:
-            if task.id == task_id:
-                if new_title:
-                    task.title = new_title
-                if new_description:
-                    task.description = new_description
-                if new_priority:
-                    task.priority = new_priority
-                if new_due_date:
-                    task.due_date = new_due_date
-                self.save_data()
-                print(f"Задача с ID {task_id} успешно отредактирована.")
-                return
-        print(f"Задача с ID {task_id} не найдена.")
+        changes = {
+            "title": new_title or None,
+            "description": new_description or None,
+            "priority": new_priority or None,
+            "due_date": new_due_date or None
+        }
+        if self.edit_records("tasks", {task_id: changes}):
+            print(f"Задача с ID {task_id} успешно отредактирована.")
+        else:
+            print(f"Задача с ID {task_id} не найдена.")
 
     def delete_task(self, task_id):
-        for i, task in enumerate(self.tasks):
-            if task.id == task_id:
-                del self.tasks[i]
-                self.save_data()
-                print(f"Задача с ID {task_id} успешно удалена.")
-                return
-        print(f"Задача с ID {task_id} не найдена.")
+        if self.delete_records("tasks", [task_id]):
+            print(f"Задача с ID {task_id} успешно удалена.")
+        else:
+            print(f"Задача с ID {task_id} не найдена.")
 
     def export_tasks_to_csv(self, file_name):
-        with open(file_name, 'w', encoding='utf-8', newline='') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(['id', 'title', 'description', 'done', 'priority', 'due_date'])
-            for task in self.tasks:
-                writer.writerow([task.id, task.title, task.description, task.done, task.priority, task.due_date])
+        self.export_collection("tasks", file_name)
         print(f"Задачи успешно экспортированы в {file_name}.")
 
-    def import_tasks_from_csv(self, file_name):
+    def import_tasks_from_csv(self, file_name, upsert=True):
         try:
-            with open(file_name, 'r', encoding='utf-8') as csvfile:
-                reader = csv.reader(csvfile)
-                next(reader)
-                for row in reader:
-                    task_id = int(row[0])
-                    title = row[1]
-                    description = row[2]
-                    done = row[3].lower() == 'true'
-                    priority = row[4]
-                    due_date = row[5]
-                    self.tasks.append(Task(task_id, title, description, done, priority, due_date))
-            self.save_data()
-            print(f"Задачи успешно импортированы из {file_name}.")
+            counts = self.import_csv("tasks", file_name, self.task_from_row, upsert)
         except FileNotFoundError:
             print(f"Файл {file_name} не найден.")
+            return None
+        print(f"Задачи успешно импортированы из {file_name}.")
+        self.print_import_counts(counts)
+        return counts
+
+    def task_from_row(self, row):
+        # Колонки: id, title, description, done, priority, due_date
+        task_id = int(row[0]) if row[0] else None
+        return Task(task_id, row[1], row[2], row[3].lower() == 'true', row[4], row[5])
 
     def tasks_menu(self):
         while True:
@@ -234,67 +658,110 @@ class PersonalAssistant:
 
     # Контакты
     def add_contact(self, name, phone, email):
-        contact_id = len(self.contacts) + 1
-        self.contacts.append(Contact(contact_id, name, phone, email))
-        self.save_data()
-
-    def search_contact(self, query):
-        results = []
-        for contact in self.contacts:
-            if query.lower() in contact.name.lower() or query in contact.phone:
-                results.append(contact)
-        return results
+        contact_id = self.new_id("contacts")
+        self.insert_records("contacts", [Contact(contact_id, name, phone, email)])
+
+    def search_contact(self, query, limit=None):
+        contacts = self.collection("contacts")
+        if self.contact_index is None:
+            self.contact_index = ContactIndex(contacts)
+        index = self.index["contacts"]
+        return [index[contact_id] for contact_id in self.contact_index.search(query, limit)]
+
+    def live_search_contacts(self):
+        # Поиск по мере ввода: каждая введенная строка сразу уточняет запрос
+        print("Вводите имя или телефон; пустая строка - выход.")
+        while True:
+            query = input("> ")
+            if not query:
+                break
+            results = self.search_contact(query, limit=LIVE_SEARCH_LIMIT)
+            for contact in results:
+                print(f"  ID: {contact.id}, Имя: {contact.name}, Телефон: {contact.phone}, Email: {contact.email}")
+            if not results:
+                print("  Контакты не найдены.")
+
+    def find_duplicate_contacts(self, threshold=DUPLICATE_THRESHOLD, workers=None):
+        # [(оценка, [id, ...]), ...]; большие списки обрабатываются пулом процессов
+        return find_duplicates(self.contacts, threshold, workers)
+
+    def merge_contacts(self, ids):
+        # Остается самый полный контакт группы, его пустые поля дополняются
+        # из остальных, остальные удаляются. Возвращает id оставшегося
+        contacts = [self.get_record("contacts", contact_id) for contact_id in ids]
+        contacts = [contact for contact in contacts if contact is not None]
+        if not contacts:
+            return None
+        keep = min(contacts, key=lambda c: (-sum(1 for v in (c.name, c.phone, c.email) if v.strip()), c.id))
+        fields = {}
+        for field in ("name", "phone", "email"):
+            if not getattr(keep, field).strip():
+                fields[field] = next((getattr(c, field) for c in contacts if getattr(c, field).strip()), "")
+        with self.transaction():
+            if fields:
+                self.edit_records("contacts", {keep.id: fields})
+            self.delete_records("contacts", [contact.id for contact in contacts if contact is not keep])
+        return keep.id
+
+    def merge_duplicate_contacts(self):
+        groups = self.find_duplicate_contacts()
+        if not groups:
+            print("Похожих контактов не найдено.")
+            return
+        print(f"Найдено групп похожих контактов: {len(groups)}")
+        merge_all = False
+        merged = 0
+        for score, ids in groups:
+            if not merge_all:
+                print(f"\nСходство {score:.2f}:")
+                for contact_id in ids:
+                    contact = self.get_record("contacts", contact_id)
+                    print(f"  ID: {contact.id}, Имя: {contact.name}, Телефон: {contact.phone}, Email: {contact.email}")
+                answer = input("Объединить? (да/нет/все/стоп): ").strip().lower()
+                if answer == "стоп":
+                    break
+                if answer == "все":
+                    merge_all = True
+                elif answer != "да":
+                    continue
+            self.merge_contacts(ids)
+            merged += 1
+        print(f"Объединено групп: {merged}.")
 
     def view_contacts(self):
-        for contact in self.contacts:
-            print(f"ID: {contact.id}, Имя: {contact.name}, Телефон: {contact.phone}, Email: {contact.email}")
+        self.show_pages(self.cursor("contacts", page_size=VIEW_PAGE_SIZE), contact_line)
 
     def edit_contact(self, contact_id, new_name, new_phone, new_email):
-        for contact in self.contacts:
-            if contact.id == contact_id:
-                if new_name:
-                    contact.name = new_name
-                if new_phone:
-                    contact.phone = new_phone
-                if new_email:
-                    contact.email = new_email
-                self.save_data()
-                print(f"Контакт с ID {contact_id} успешно отредактирован.")
-                return
+        changes = {"name": new_name or None, "phone": new_phone or None, "email": new_email or None}
+        if self.edit_records("contacts", {contact_id: changes}):
+            print(f"Контакт с ID {contact_id} успешно отредактирован.")
+        else:
             print(f"Контакт с ID {contact_id} не найден.")
 
     def delete_contact(self, contact_id):
-        for i, contact in enumerate(self.contacts):
-            if contact.id == contact_id:
-                del self.contacts[i]
-                self.save_data()
-                print(f"Контакт с ID {contact_id} успешно удален.")
-                return
-        print(f"Контакт с ID {contact_id} не найден.")
+        if self.delete_records("contacts", [contact_id]):
+            print(f"Контакт с ID {contact_id} успешно удален.")
+        else:
+            print(f"Контакт с ID {contact_id} не найден.")
 
     def export_contacts_to_csv(self, file_name):
-        with open(file_name, 'w', encoding='utf-8', newline='') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(['id', 'name', 'phone', 'email'])
-            for contact in self.contacts:
-                writer.writerow([contact.id, contact.name, contact.phone, contact.email])
+        self.export_collection("contacts", file_name)
         print(f"Контакты успешно экспортированы в {file_name}.")
 
-    def import_contacts_from_csv(self, file_name):
+    def import_contacts_from_csv(self, file_name, upsert=True):
         try:
-            with open(file_name, 'r', encoding='utf-8') as csvfile:
-                reader = csv.reader(csvfile)
-                next(reader)  # Пропустить заголовок
-                for row in reader:
-                    contact_id = int(row[0])
-                    name = row[1]
-                    phone = row[2]
-                    email = row[3]
-                    self.contacts.append(Contact(contact_id, name, phone, email))
-            self.save_data()
-            print(f"Контакты успешно импортированы из {file_name}.")
+            counts = self.import_csv("contacts", file_name, self.contact_from_row, upsert)
         except FileNotFoundError:
             print(f"Файл {file_name} не найден.")
+            return None
+        print(f"Контакты успешно импортированы из {file_name}.")
+        self.print_import_counts(counts)
+        return counts
+
+    def contact_from_row(self, row):
+        # Колонки: id, name, phone, email
+        contact_id = int(row[0]) if row[0] else None
+        return Contact(contact_id, row[1], row[2], row[3])
 
     def contacts_menu(self):
         while True:
@@ -306,7 +773,9 @@ class PersonalAssistant:
             print("5. Удалить контакт")
             print("6. Экспорт контактов в CSV")
             print("7. Импорт контактов из CSV")
-            print("8. Назад")
+            print("8. Поиск по мере ввода")
+            print("9. Найти и объединить дубликаты")
+            print("10. Назад")
             choice = input("Выберите действие: ")
             if choice == "1":
                 name = input("Введите имя: ")
@@ -341,56 +810,242 @@ class PersonalAssistant:
                 file_name = input("Введите имя файла для импорта: ")
                 self.import_contacts_from_csv(file_name)
             elif choice == "8":
+                self.live_search_contacts()
+            elif choice == "9":
+                self.merge_duplicate_contacts()
+            elif choice == "10":
                 break
 
     # Финансы
     def add_finance_record(self, type, amount, category, date, description):
-        record_id = len(self.finance_records) + 1
-        self.finance_records.append(FinanceRecord(record_id, type, amount, category, date, description))
-        self.save_data()
+        record_id = self.new_id("finance")
+        self.insert_records("finance", [FinanceRecord(record_id, type, amount, category, date, description)])
+
+    def edit_finance_record(self, record_id, new_type, new_amount, new_category, new_date, new_description):
+        changes = {
+            "type": new_type or None,
+            "amount": new_amount,
+            "category": new_category or None,
+            "date": datetime.strptime(new_date, "%d-%m-%Y").date() if new_date else None,
+            "description": new_description or None
+        }
+        if self.edit_records("finance", {record_id: changes}):
+            print(f"Запись с ID {record_id} успешно отредактирована.")
+        else:
+            print(f"Запись с ID {record_id} не найдена.")
+
+    def delete_finance_record(self, record_id):
+        if self.delete_records("finance", [record_id]):
+            print(f"Запись с ID {record_id} успешно удалена.")
+        else:
+            print(f"Запись с ID {record_id} не найдена.")
 
     def view_finance_records(self, date_filter=None, category_filter=None):
-        filtered_records = self.finance_records
+        day = None
         if date_filter:
-            filtered_records = [record for record in filtered_records if record.date == date_filter]
-
-        if category_filter:
-            filtered_records = [record for record in filtered_records if record.category == category_filter]
-        for record in filtered_records:
-            print(
-                f"ID: {record.id}, Тип: {record.type}, Сумма: {record.amount}, Категория: {record.category}, Дата: {record.date}")
+            try:
+                day = parse_date(date_filter)
+            except ValueError:
+                print("Ошибка: неверный формат даты. Используйте формат ДД-ММ-ГГГГ.")
+                return
+        where = (lambda record: record.category == category_filter) if category_filter else None
+        if day is not None:
+            # За день - только срез индекса по дате
+            self.collection("finance")
+            cursor = self.cursor("finance", "date", page_size=VIEW_PAGE_SIZE, where=where,
+                                 bounds=self.date_index.bounds(day, day))
+        elif category_filter:
+            cursor = Cursor(list(self.select_finance_records(category=category_filter)), page_size=VIEW_PAGE_SIZE)
+        else:
+            cursor = self.cursor("finance", "date", page_size=VIEW_PAGE_SIZE)
+        self.show_pages(cursor, finance_line)
 
-    def import_finance_records_from_csv(self, file_name):
+    def import_finance_records_from_csv(self, file_name, chunk_size=IMPORT_CHUNK_SIZE, rejects_file=None, upsert=True):
         try:
-            with open(file_name, 'r', encoding='utf-8') as csvfile:
-                reader = csv.reader(csvfile)
-                next(reader)  # Пропустить заголовок
-                for row in reader:
-                    record_id = int(row[0])
-                    type = row[1]
-                    try:
-                        amount = float(row[2])
-                    except ValueError:
-                        continue
-                    category = row[3]
-                    date = row[4]
-                    description = row[5] if len(row) > 5 else ""
-                    self.finance_records.append(FinanceRecord(record_id, amount, category, date, description))
-            self.save_data()
-            print(f"Финансовые записи успешно импортированы из {file_name}.")
+            counts = self.import_csv("finance", file_name, self.finance_record_from_row, upsert, chunk_size,
+                                     rejects_file)
         except FileNotFoundError:
             print(f"Файл {file_name} не найден.")
+            return None
         except Exception as e:
             print(f"Ошибка при импорте финансовых записей из файла {file_name}: {e}")
+            return None
+        print(f"Финансовые записи успешно импортированы из {file_name}.")
+        self.print_import_counts(counts)
+        return counts
+
+    def finance_record_from_row(self, row):
+        # Колонки: id, type, amount, category, date[, description]; пустой id - новая запись
+        record_id = int(row[0]) if row[0] else None
+        type = row[1].lower()
+        if type not in ("доход", "расход"):
+            raise ValueError(f"неизвестный тип записи '{row[1]}'")
+        amount = float(row[2])
+        category = row[3]
+        date = parse_date(row[4])
+        description = row[5] if len(row) > 5 else ""
+        return FinanceRecord(record_id, type, amount, category, date, description)
 
     def export_finance_records_to_csv(self, file_name):
-        with open(file_name, 'w', encoding='utf-8', newline='') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(['id', 'amount', 'category', 'date', 'description'])
-            for record in self.finance_records:
-                writer.writerow([record.id, record.amount, record.category, record.date, record.description])
+        self.export_collection("finance", file_name)
         print(f"Финансовые записи успешно экспортированы в {file_name}.")
 
+    def export_collection(self, name, file_name):
+        # Незагруженная коллекция выгружается по страницам прямо из хранилища
+        return write_csv_pages(file_name, name, self.iter_collection(name, EXPORT_BATCH_SIZE))
+
+    def export_all_data(self, directory, columnar=False, workers=None):
+        # Все коллекции выгружаются одновременно, каждая в свой файл
+        os.makedirs(directory, exist_ok=True)
+        collections = {name: self.collection(name) for name in COLLECTIONS}
+        started = time.perf_counter()
+        results = export_all(collections, directory, columnar, workers)
+        elapsed = time.perf_counter() - started
+        for file_name, count, seconds in results:
+            print(f"{file_name}: записей - {count}, {seconds:.2f} с")
+        print(f"Экспорт завершен за {elapsed:.2f} с.")
+        return results
+
+    # Импорт CSV
+    def import_csv(self, name, file_name, record_from_row, upsert=True, chunk_size=IMPORT_CHUNK_SIZE,
+                   rejects_file=None):
+        # Файл читается потоком: каждые chunk_size строк сразу сохраняются,
+        # а отклоненные строки с причиной пишутся в rejects_file. В режиме upsert
+        # строки сопоставляются с записями коллекции по отпечаткам содержимого:
+        # совпавшие пропускаются или дополняют запись, остальные добавляются.
+        # Без upsert строка с существующим id заменяет запись.
+        rejects_file = rejects_file or file_name + ".rejects.csv"
+        started = time.perf_counter()
+        counts = {"inserted": 0, "updated": 0, "skipped": 0, "rejected": 0}
+        fingerprints = self.record_fingerprints(name) if upsert else None
+        # id записей, уже сопоставленных строкам файла или добавленных из него
+        taken = set()
+        self.autosave_views = False
+        try:
+            with open(file_name, 'r', encoding='utf-8') as csvfile, \
+                    open(rejects_file, 'w', encoding='utf-8', newline='') as rejectsfile:
+                reader = csv.reader(csvfile)
+                rejects = csv.writer(rejectsfile)
+                next(reader, None)  # Пропустить заголовок
+                chunk = []
+                for line_number, row in enumerate(reader, start=2):
+                    try:
+                        chunk.append(record_from_row(row))
+                    except (ValueError, IndexError) as e:
+                        counts["rejected"] += 1
+                        rejects.writerow([line_number, str(e)] + row)
+                        continue
+                    if len(chunk) >= chunk_size:
+                        self.import_chunk(name, chunk, fingerprints, taken, counts)
+                        chunk = []
+                if chunk:
+                    self.import_chunk(name, chunk, fingerprints, taken, counts)
+        finally:
+            self.autosave_views = True
+            if self.pending is None and self.note_index_changes:
+                self.save_views()
+        if counts["rejected"]:
+            counts["rejects_file"] = rejects_file
+        else:
+            os.remove(rejects_file)
+        if fingerprints is not None and self.pending is None:
+            self.save_fingerprints(name)
+        counts["seconds"] = time.perf_counter() - started
+        return counts
+
+    def import_chunk(self, name, chunk, fingerprints, taken, counts):
+        if fingerprints is None:
+            for record in chunk:
+                if record.id is None:
+                    record.id = self.new_id(name)
+            self.insert_records(name, chunk)
+            counts["inserted"] += len(chunk)
+            return
+        merge_fields = FINGERPRINTS[name][1]
+        index = self.index[name]
+        inserted = []
+        changes = {}
+        for record in chunk:
+            record_id = fingerprints.match(record, taken)
+            if record_id is None:
+                # id из файла сохраняется, если он свободен
+                if record.id is None or record.id in index or record.id in taken:
+                    record.id = self.new_id(name)
+                elif record.id >= self.next_ids[name]:
+                    self.next_ids[name] = record.id + 1
+                taken.add(record.id)
+                inserted.append(record)
+                continue
+            taken.add(record_id)
+            existing = index[record_id]
+            fields = {}
+            for field in merge_fields:
+                value = getattr(record, field)
+                # Импорт только дополняет: пустое поле из файла не стирает значение,
+                # а старая выгрузка не снимает отметку о выполнении (done=False)
+                if value and value != getattr(existing, field):
+                    fields[field] = value
+            if fields:
+                changes[record_id] = fields
+            else:
+                counts["skipped"] += 1
+        if inserted:
+            self.insert_records(name, inserted)
+            counts["inserted"] += len(inserted)
+        if changes:
+            self.edit_records(name, changes)
+            counts["updated"] += len(changes)
+
+    def print_import_counts(self, counts):
+        total = counts["inserted"] + counts["updated"] + counts["skipped"] + counts["rejected"]
+        print(f"  Добавлено: {counts['inserted']}, обновлено: {counts['updated']}, "
+              f"пропущено повторов: {counts['skipped']}, отклонено: {counts['rejected']}"
+              + (f" (см. {counts['rejects_file']})" if counts["rejected"] else ""))
+        print(f"  Скорость: {total / counts['seconds'] if counts['seconds'] else 0:.0f} строк/с")
+        if resource is not None:
+            # ru_maxrss в Linux указывается в килобайтах
+            print(f"  Пиковая память: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} МБ")
+
+    def record_fingerprints(self, name):
+        # Отпечатки строятся при первом импорте и хранятся рядом с данными;
+        # сохраненные годятся, только если не было изменений после сохранения
+        items = self.collection(name)
+        if name not in self.fingerprints:
+            data = self.storage.load_meta(f"fingerprints_{name}")
+            if data is not None and data.get("count") == len(items):
+                self.fingerprints[name] = RecordFingerprints.from_dict(name, data)
+            else:
+                self.fingerprints[name] = RecordFingerprints(name, items)
+                self.save_fingerprints(name)
+        return self.fingerprints[name]
+
+    def load_fingerprints_saved(self):
+        if self.fingerprints_saved is None:
+            self.fingerprints_saved = set(self.storage.load_meta("fingerprints") or ())
+        return self.fingerprints_saved
+
+    def save_fingerprints(self, name=None):
+        saved = self.load_fingerprints_saved()
+        for name in [name] if name else list(self.fingerprints):
+            self.storage.save_meta(f"fingerprints_{name}", self.fingerprints[name].to_dict())
+            self.fingerprints_changed.discard(name)
+            if name not in saved:
+                saved.add(name)
+                self.storage.save_meta("fingerprints", sorted(saved))
+
+    def fingerprints_invalidate(self, name):
+        # Сохраненные отпечатки стираются при первом изменении коллекции после
+        # сохранения, чтобы после сбоя не загрузить устаревшие; коллекции,
+        # которые ни разу не импортировались, ничего не пишут
+        if name in self.fingerprints_changed:
+            return
+        self.fingerprints_changed.add(name)
+        saved = self.load_fingerprints_saved()
+        if name in saved:
+            saved.discard(name)
+            self.storage.save_meta(f"fingerprints_{name}", None)
+            self.storage.save_meta("fingerprints", sorted(saved))
+
     def finance_menu(self):
         while True:
             print("\nУправление финансовыми записями:")
@@ -399,7 +1054,10 @@ class PersonalAssistant:
             print("3. Генерация отчета")
             print("4. Экспорт в CSV")
             print("5. Импорт из CSV")
-            print("6. Назад")
+            print("6. Редактировать запись")
+            print("7. Удалить запись")
+            print("8. Проверить итоги")
+            print("9. Назад")
             choice = input("Выберите действие: ")
             if choice == "1":
                 while True:
@@ -428,6 +1086,20 @@ class PersonalAssistant:
                 file_name = input("Введите имя файла для импорта: ")
                 self.import_finance_records_from_csv(file_name)
             elif choice == "6":
+                record_id = int(input("Введите ID записи: "))
+                new_type = input("Введите новый тип (доход/расход, или оставьте пустым): ").lower()
+                new_amount = input("Введите новую сумму (или оставьте пустым): ")
+                new_category = input("Введите новую категорию (или оставьте пустым): ")
+                new_date = input("Введите новую дату (ДД-ММ-ГГГГ, или оставьте пустым): ")
+                new_description = input("Введите новое описание (или оставьте пустым): ")
+                self.edit_finance_record(record_id, new_type, float(new_amount) if new_amount else None,
+                                         new_category, new_date, new_description)
+            elif choice == "7":
+                record_id = int(input("Введите ID записи: "))
+                self.delete_finance_record(record_id)
+            elif choice == "8":
+                self.check_finance_aggregates()
+            elif choice == "9":
                 break
 
     def generate_report(self, start_date_str, end_date_str):
@@ -438,50 +1110,219 @@ class PersonalAssistant:
             print("Ошибка: неверный формат даты. Используйте формат ДД-ММ-ГГГГ.")
             return
 
-        filtered_records = [
-            record for record in self.finance_records
-            if isinstance(record.date, date) and start_date <= record.date <= end_date
-        ]
-
-        filtered_records = filtered_records or []
-
+        records, count, (total_income, total_expense), categories = self.finance_report(start_date, end_date)
         print(f"Отчет за период с {start_date} по {end_date}:")
 
-        if filtered_records:
-            for record in filtered_records:
-                print(f"  {record.date}: {record.type} - {record.amount} ({record.category})")
+        for record in records:
+            print(f"  {record.date}: {record.type} - {record.amount} ({record.category})")
 
-            total_income = sum(record.amount for record in filtered_records if record.type == "доход")
-            total_expense = sum(record.amount for record in filtered_records if record.type == "расход")
+        if count:
             balance = total_income - total_expense
 
+            print(f"  Записей: {count}")
             print(f"  Доходы: {total_income}")
             print(f"  Расходы: {total_expense}")
             print(f"  Баланс: {balance}")
+            print("  По категориям:")
+            for category, (income, expense) in categories.items():
+                print(f"    {category}: доходы {income}, расходы {expense}")
         else:
             print("  Записи не найдены.")
 
+    def finance_report(self, start=None, end=None):
+        # (записи за период по дате, их число, (доходы, расходы), {категория: (доходы, расходы)}).
+        # Если финансы разделены по годам и еще не загружены, читаются только
+        # затронутые годы, параллельно, и их итоги складываются
+        shards = [] if "finance" in self.data else self.storage.shards("finance")
+        if not shards:
+            self.collection("finance")
+            return (self.date_index.range(start, end), self.date_index.count(start, end),
+                    self.finance_totals(start, end), self.category_breakdown(start, end))
+        years = [year for year in shards
+                 if (start is None or year >= start.year) and (end is None or year <= end.year)]
+        parts = []
+        if years:
+            with ThreadPoolExecutor(max_workers=min(len(years), FINANCE_SHARD_WORKERS)) as pool:
+                parts = list(pool.map(lambda year: self.finance_shard_report(year, start, end), years))
+        records = []
+        total_income = total_expense = 0.0
+        categories = {}
+        for part_records, income, expense, part_categories in parts:
+            records.extend(part_records)
+            total_income += income
+            total_expense += expense
+            for category, (category_income, category_expense) in part_categories.items():
+                income, expense = categories.get(category, (0.0, 0.0))
+                categories[category] = (income + category_income, expense + category_expense)
+        return records, len(records), (total_income, total_expense), categories
+
+    def finance_shard_report(self, year, start, end):
+        records = self.finance_shards.get(year)
+        if records is None:
+            records = self.storage.load_shard("finance", FinanceRecord, year)
+            records.sort(key=lambda record: (record.date, record.id))
+            self.finance_shards[year] = records
+        low = 0 if start is None else bisect_left(records, start, key=lambda record: record.date)
+        high = len(records) if end is None else bisect_right(records, end, key=lambda record: record.date)
+        selected = records[low:high]
+        income = expense = 0.0
+        categories = {}
+        for record in selected:
+            category_income, category_expense = categories.get(record.category, (0.0, 0.0))
+            if record.type == "доход":
+                income += record.amount
+                category_income += record.amount
+            elif record.type == "расход":
+                expense += record.amount
+                category_expense += record.amount
+            categories[record.category] = (category_income, category_expense)
+        return selected, income, expense, categories
+
+    def select_finance_records(self, start=None, end=None, category=None):
+        # Записи за период берутся из индекса по дате, остальное - из колоночного журнала или перебором
+        self.collection("finance")
+        if start is not None or end is not None:
+            records = self.date_index.range(start, end)
+            if category is None:
+                return records
+            return (record for record in records if record.category == category)
+        if self.ledger is not None:
+            index = self.index["finance"]
+            return (index[record_id] for record_id in self.ledger.select_ids(category=category))
+        return (record for record in self.finance_records
+                if category is None or record.category == category)
+
+    def finance_totals(self, start=None, end=None, category=None):
+        # Итоги по всем категориям - из накопленных сумм, по одной категории -
+        # векторно из колоночного журнала или перебором записей за период
+        self.collection("finance")
+        if category is None:
+            return self.aggregates.totals(start, end)
+        if self.ledger is not None:
+            return self.ledger.totals(start, end, category)
+        income = expense = 0.0
+        for record in self.select_finance_records(start, end, category):
+            if record.type == "доход":
+                income += record.amount
+            elif record.type == "расход":
+                expense += record.amount
+        return income, expense
+
+    def check_finance_aggregates(self):
+        # Пересчитать итоги с нуля и сравнить с накопленными
+        fresh = FinanceAggregates(self.finance_records)
+        differences = self.aggregates.diff(fresh)
+        if not differences:
+            print("Итоги совпадают с пересчитанными по записям.")
+            return
+        print(f"Найдены расхождения ({len(differences)}):")
+        for difference in differences:
+            print(f"  {difference}")
+        self.aggregates = fresh
+        self.calc.invalidate()
+        self.storage.save_meta("finance_aggregates", fresh.to_dict())
+        print("Итоги пересчитаны и сохранены.")
+
+    def finance_value(self, column, key=None):
+        # column: 0 - доходы, 1 - расходы; key - категория или месяц ГГГГ-ММ
+        self.collection("finance")
+        if key is None:
+            return self.aggregates.totals()[column]
+        is_month = len(key) == 7 and key[4] == "-" and (key[:4] + key[5:]).isdigit()
+        entry = (self.aggregates.months if is_month else self.aggregates.categories).get(key)
+        return entry[column] if entry else 0.0
+
+    def category_breakdown(self, start=None, end=None):
+        self.collection("finance")
+        if self.ledger is not None:
+            return self.ledger.by_category(start, end)
+        breakdown = {}
+        for record in self.select_finance_records(start, end):
+            income, expense = breakdown.get(record.category, (0.0, 0.0))
+            if record.type == "доход":
+                income += record.amount
+            elif record.type == "расход":
+                expense += record.amount
+            breakdown[record.category] = (income, expense)
+        return breakdown
+
     # Калькулятор
     def calculator(self):
         while True:
             try:
-                expression = input("Введите выражение (или 'выход' для возврата): ")
+                expression = input("Введите выражение ('файл' - вычислить выражения из файла, 'выход' - возврат): ")
                 if expression.lower() == "выход":
                     break
-                result = eval(expression)
+                if expression.lower() == "файл":
+                    file_name = input("Введите имя файла: ")
+                    for number, line, result in self.calc.evaluate_file(file_name):
+                        if isinstance(result, Exception):
+                            print(f"{number}: {line} -> Ошибка: {result}")
+                        else:
+                            print(f"{number}: {line} = {result}")
+                    continue
+                result = self.calc.evaluate(expression)
                 print(f"Результат: {result}")
             except Exception as e:
                 print(f"Ошибка: {e}")
 
+    # Статистика операций
+    def enable_profiling(self):
+        if self.profiler is None:
+            self.profiler = Profiler()
+        self.profiler.instrument(self, PROFILED_OPERATIONS)
+        self.profiler.instrument(self, PROFILED_MEMORY_OPERATIONS, measure_io=False)
+        # Обертки хранилища (BackgroundWriter, ShardedStorage) замеряются вместе с вложенным
+        storage = self.storage
+        while storage is not None:
+            self.profiler.instrument(storage, STORAGE_OPERATIONS)
+            storage = getattr(storage, "storage", None)
+
+    def profile_stats(self):
+        dates = parse_date.cache_info()
+        return {
+            "operations": self.profiler.to_dict() if self.profiler else {},
+            "parse_date": {"calls": dates.hits + dates.misses, "cached": dates.hits, "cache_size": dates.currsize},
+        }
+
+    def show_stats(self):
+        if self.profiler is None:
+            print("Сбор статистики выключен.")
+            if input("Включить? (да/нет): ").strip().lower() == "да":
+                self.enable_profiling()
+                print("Сбор статистики включен.")
+            return
+        stats = self.profile_stats()
+        if not stats["operations"]:
+            print("Операции еще не выполнялись.")
+        else:
+            print(f"{'Операция':50} {'вызовов':>8} {'всего, с':>9} {'p50, мс':>9} {'p95, мс':>9} "
+                  f"{'p99, мс':>9} {'чтение, КБ':>11} {'запись, КБ':>11}")
+            for name, operation in stats["operations"].items():
+                print(f"{name:50} {operation['count']:8} {operation['total']:9.3f} "
+                      f"{operation['p50'] * 1000:9.3f} {operation['p95'] * 1000:9.3f} {operation['p99'] * 1000:9.3f} "
+                      f"{operation['bytes_read'] / 1024:11.1f} {operation['bytes_written'] / 1024:11.1f}")
+        dates = stats["parse_date"]
+        print(f"Разбор дат финансовых записей: {dates['calls']} вызовов, из кэша {dates['cached']}")
+
+    def dump_stats(self, file_name):
+        with open(file_name, "w", encoding="utf-8") as f:
+            json.dump(self.profile_stats(), f, ensure_ascii=False, indent=2)
+
+    def print_main_menu(self):
+        print("\nДобро пожаловать в Персональный помощник!")
+        print("1. Управление заметками")
+        print("2. Управление задачами")
+        print("3. Управление контактами")
+        print("4. Управление финансовыми записями")
+        print("5. Калькулятор")
+        print("6. Экспорт всех данных")
+        print("7. Статистика")
+        print("8. Выход")
+
     def main_menu(self):
         while True:
-            print("\nДобро пожаловать в Персональный помощник!")
-            print("1. Управление заметками")
-            print("2. Управление задачами")
-            print("3. Управление контактами")
-            print("4. Управление финансовыми записями")
-            print("5. Калькулятор")
-            print("6. Выход")
+            self.print_main_menu()
             choice = input("Выберите действие: ")
             if choice == "1":
                 self.notes_menu()
@@ -494,6 +1335,14 @@ class PersonalAssistant:
             elif choice == "5":
                 self.calculator()
             elif choice == "6":
+                directory = input("Введите папку для экспорта: ")
+                columnar = input("Сохранить финансы в колоночном формате? (да/нет): ").strip().lower() == "да"
+                self.export_all_data(directory or ".", columnar)
+            elif choice == "7":
+                self.show_stats()
+            elif choice == "8":
+                self.save_views()
+                self.storage.flush()
                 print("До свидания!")
                 break
             else:
@@ -509,7 +1358,8 @@ class PersonalAssistant:
             print("5. Удалить заметку")
             print("6. Экспорт заметок в CSV")
             print("7. Импорт заметок из CSV")
-            print("8. Назад")
+            print("8. Поиск заметок")
+            print("9. Назад")
             choice = input("Выберите действие: ")
             if choice == "1":
                 title = input("Введите заголовок: ")
@@ -535,6 +1385,15 @@ class PersonalAssistant:
                 file_name = input("Введите имя файла для импорта: ")
                 self.import_notes_from_csv(file_name)
             elif choice == "8":
+                query = input("Введите слова для поиска: ")
+                results = self.search_notes(query)
+                if results:
+                    print("Найденные заметки:")
+                    for note in results:
+                        print(f"ID: {note.id}, Заголовок: {note.title}, Дата: {note.timestamp}")
+                else:
+                    print("Заметки не найдены.")
+            elif choice == "9":
                 break
             else:
                 print("Неверный выбор.")
@@ -549,13 +1408,18 @@ class PersonalAssistant:
             print("5. Удалить задачу")
             print("6. Экспорт задач в CSV")
             print("7. Импорт задач из CSV")
-            print("8. Назад")
+            print("8. Ближайшие задачи")
+            print("9. Просроченные задачи")
+            print("10. Задачи на сегодня")
+            print("11. Назад")
             choice = input("Выберите действие: ")
             if choice == "1":
                 title = input("Введите заголовок: ")
                 description = input("Введите описание: ")
                 priority = input("Введите приоритет (Высокий/Средний/Низкий): ")
                 due_date = input("Введите срок выполнения (ДД-ММ-ГГГГ): ")
+                if due_date and parse_due_date(due_date) is None:
+                    print("Неверный формат даты. Задача будет без срока.")
                 self.add_task(title, description, priority, due_date)
             elif choice == "2":
                 self.view_tasks()
@@ -568,6 +1432,9 @@ class PersonalAssistant:
                 new_description = input("Введите новое описание (или оставьте пустым): ")
                 new_priority = input("Введите новый приоритет (или оставьте пустым): ")
                 new_due_date = input("Введите новый срок выполнения (или оставьте пустым): ")
+                if new_due_date and parse_due_date(new_due_date) is None:
+                    print("Неверный формат даты. Срок не изменен.")
+                    new_due_date = ""
                 self.edit_task(task_id, new_title, new_description, new_priority, new_due_date)
             elif choice == "5":
                 task_id = int(input("Введите ID задачи: "))
@@ -579,6 +1446,13 @@ class PersonalAssistant:
                 file_name = input("Введите имя файла для импорта: ")
                 self.import_tasks_from_csv(file_name)
             elif choice == "8":
+                self.view_tasks(self.upcoming_tasks())
+            elif choice == "9":
+                only_high = input("Только высокий приоритет? (да/нет): ").strip().lower() == "да"
+                self.view_tasks(self.overdue_tasks(priority=1 if only_high else None))
+            elif choice == "10":
+                self.view_tasks(self.tasks_due_today())
+            elif choice == "11":
                 break
             else:
                 print("Неверный выбор.")
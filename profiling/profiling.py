@@ -0,0 +1,117 @@
+import functools
+import random
+import threading
+import time
+
+# Сколько замеров времени хранится на операцию для перцентилей (выборка по алгоритму R)
+MAX_SAMPLES = 10000
+
+IO_COUNTERS_FILE = "/proc/self/io"
+
+
+def io_counters():
+    # (прочитано, записано, служебное чтение) байт через системные вызовы процесса; None, если счетчики недоступны.
+    # Счетчики общие для процесса: ввод-вывод фонового потока записи попадает в замер,
+    # если совпал с ним по времени
+    try:
+        with open(IO_COUNTERS_FILE, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    counters = dict(line.split(b": ") for line in data.splitlines())
+    # Третье значение - размер самого ответа: это чтение попадет в rchar следующего замера
+    return int(counters[b"rchar"]), int(counters[b"wchar"]), len(data)
+
+
+def percentile(samples, fraction):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class OperationStats:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.samples = []
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    def add(self, elapsed, bytes_read, bytes_written, rng):
+        self.count += 1
+        self.total += elapsed
+        self.bytes_read += bytes_read
+        self.bytes_written += bytes_written
+        if len(self.samples) < MAX_SAMPLES:
+            self.samples.append(elapsed)
+        else:
+            position = rng.randrange(self.count)
+            if position < MAX_SAMPLES:
+                self.samples[position] = elapsed
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "total": self.total,
+            "p50": percentile(self.samples, 0.50),
+            "p95": percentile(self.samples, 0.95),
+            "p99": percentile(self.samples, 0.99),
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+        }
+
+
+class Profiler:
+    # Счетчики вызовов, время и ввод-вывод отдельных операций. Методы объекта
+    # оборачиваются только в instrument, поэтому без профилировщика код
+    # выполняется как обычно, без единой лишней проверки.
+
+    def __init__(self):
+        self.operations = {}
+        self.lock = threading.Lock()
+        self.rng = random.Random(0)
+        self.has_io_counters = io_counters() is not None
+
+    def record(self, name, elapsed, bytes_read=0, bytes_written=0):
+        with self.lock:
+            stats = self.operations.get(name)
+            if stats is None:
+                stats = self.operations[name] = OperationStats()
+            stats.add(elapsed, bytes_read, bytes_written, self.rng)
+
+    def wrap(self, name, function, measure_io=True):
+        profiler = self
+        measure_io = measure_io and self.has_io_counters
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            before = io_counters() if measure_io else None
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                if before is None:
+                    profiler.record(name, elapsed)
+                else:
+                    after = io_counters()
+                    profiler.record(name, elapsed, after[0] - before[0] - before[2], after[1] - before[1])
+
+        wrapper.profiled = True
+        return wrapper
+
+    def instrument(self, obj, methods, prefix=None, measure_io=True):
+        # Подменить методы экземпляра obj обертками; prefix - имя в статистике.
+        # Для операций без ввода-вывода measure_io=False: чтение счетчиков
+        # стоит десятки микросекунд, больше самой операции
+        prefix = prefix or type(obj).__name__
+        for method in methods:
+            function = getattr(obj, method, None)
+            if function is None or getattr(function, "profiled", False):
+                continue
+            setattr(obj, method, self.wrap(f"{prefix}.{method}", function, measure_io))
+
+    def to_dict(self):
+        with self.lock:
+            return {name: stats.to_dict() for name, stats in sorted(self.operations.items())}
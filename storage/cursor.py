@@ -0,0 +1,81 @@
+from bisect import bisect_left, bisect_right
+
+# Размер страницы по умолчанию
+PAGE_SIZE = 100
+
+
+class Cursor:
+    # Постраничный обход последовательности записей, упорядоченной по key.
+    # Продолжить с места остановки можно по смещению (offset) или по ключу
+    # последней полученной записи (after = cursor.last_key): ключ остается
+    # верным, даже если записи до него добавлялись или удалялись. Записи не
+    # копируются - каждая страница берется срезом по позиции; where отбирает
+    # записи внутри диапазона bounds (позиции в items).
+
+    def __init__(self, items, key=None, page_size=PAGE_SIZE, reverse=False, after=None, offset=0, where=None,
+                 bounds=None):
+        self.items = items
+        self.key = key
+        self.page_size = page_size
+        self.reverse = reverse
+        self.where = where
+        self.low, self.high = bounds or (0, len(items))
+        self.last_key = after
+        if after is not None:
+            # Обратный порядок идет от конца к началу: позиция - граница еще не выданных записей
+            if reverse:
+                self.position = max(self.low, bisect_left(items, after, self.low, self.high, key=key))
+            else:
+                self.position = min(self.high, bisect_right(items, after, self.low, self.high, key=key))
+        else:
+            self.position = self.high if reverse else self.low
+        if reverse:
+            self.position = max(self.low, self.position - offset)
+        else:
+            self.position = min(self.high, self.position + offset)
+
+    def has_more(self):
+        if self.where is not None:
+            return self.peek()
+        return self.position > self.low if self.reverse else self.position < self.high
+
+    def peek(self):
+        # Есть ли впереди запись, подходящая под where (позиция не сдвигается)
+        if self.reverse:
+            return any(self.where(self.items[i]) for i in range(self.position - 1, self.low - 1, -1))
+        return any(self.where(self.items[i]) for i in range(self.position, self.high))
+
+    def next_page(self):
+        items = self.items
+        if self.where is None:
+            if self.reverse:
+                start = max(self.low, self.position - self.page_size)
+                page = items[start:self.position][::-1]
+                self.position = start
+            else:
+                end = min(self.high, self.position + self.page_size)
+                page = items[self.position:end]
+                self.position = end
+        else:
+            page = []
+            step = -1 if self.reverse else 1
+            while len(page) < self.page_size and (self.position > self.low if self.reverse
+                                                  else self.position < self.high):
+                item = items[self.position - 1 if self.reverse else self.position]
+                self.position += step
+                if self.where(item):
+                    page.append(item)
+        if page and self.key is not None:
+            self.last_key = self.key(page[-1])
+        return page
+
+    def pages(self):
+        while True:
+            page = self.next_page()
+            if not page:
+                return
+            yield page
+
+    def __iter__(self):
+        for page in self.pages():
+            yield from page
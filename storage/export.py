@@ -0,0 +1,101 @@
+import csv
+import os
+import time
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # без pyarrow финансы выгружаются в собственный колоночный формат
+    pyarrow = None
+
+from parallel import SHARED, map_jobs
+from snapshot import dump_snapshot
+from storage import record_fields
+
+# Сколько строк CSV передается в один вызов writerows
+EXPORT_BATCH_SIZE = 10000
+
+
+def note_row(note):
+    return note.id, note.title, note.content, note.timestamp
+
+
+def task_row(task):
+    due_date = task.due_date.strftime("%d-%m-%Y") if task.due_date else task.due_text
+    return task.id, task.title, task.description, task.done, task.priority, due_date
+
+
+def contact_row(contact):
+    return contact.id, contact.name, contact.phone, contact.email
+
+
+def finance_row(record):
+    return (record.id, record.type, record.amount, record.category,
+            record.date.strftime("%d-%m-%Y"), record.description)
+
+
+# Коллекция -> (заголовок CSV, функция строки)
+CSV_COLUMNS = {
+    "notes": (["id", "title", "content", "timestamp"], note_row),
+    "tasks": (["id", "title", "description", "done", "priority", "due_date"], task_row),
+    "contacts": (["id", "name", "phone", "email"], contact_row),
+    "finance": (["id", "type", "amount", "category", "date", "description"], finance_row),
+}
+
+COLUMNAR_EXTENSION = ".parquet" if pyarrow is not None else ".bin"
+
+
+def write_csv(file_name, name, items):
+    pages = (items[start:start + EXPORT_BATCH_SIZE] for start in range(0, len(items), EXPORT_BATCH_SIZE))
+    return write_csv_pages(file_name, name, pages)
+
+
+def write_csv_pages(file_name, name, pages):
+    # pages - списки записей, например страницы незагруженной коллекции из хранилища
+    header, row = CSV_COLUMNS[name]
+    count = 0
+    with open(file_name, 'w', encoding='utf-8', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(header)
+        for page in pages:
+            writer.writerows(map(row, page))
+            count += len(page)
+    return count
+
+
+def write_columnar(file_name, records):
+    # .parquet пишется через pyarrow, любое другое имя - двоичным снимком
+    # (см. snapshot.py): колонки чисел и дат читаются без разбора текста
+    fields = record_fields(type(records[0])) if records else ()
+    if file_name.endswith(".parquet"):
+        if pyarrow is None:
+            raise RuntimeError("Для формата Parquet нужен пакет pyarrow")
+        columns = {field: [getattr(record, field) for record in records] for field in fields}
+        pyarrow.parquet.write_table(pyarrow.table(columns), file_name)
+    else:
+        with open(file_name, "wb") as f:
+            dump_snapshot(f, fields, records)
+    return len(records)
+
+
+def export_job(job):
+    kind, name, file_name = job
+    items = SHARED[name]
+    started = time.perf_counter()
+    if kind == "csv":
+        count = write_csv(file_name, name, items)
+    else:
+        count = write_columnar(file_name, items)
+    return file_name, count, time.perf_counter() - started
+
+
+def export_all(collections, directory=".", columnar=False, workers=None):
+    # collections: {имя коллекции: список записей}. Каждый файл - отдельное
+    # задание; задания выполняются в пуле процессов (или потоков, если fork
+    # недоступен). Возвращает [(файл, записей, секунд)] в порядке заданий.
+    jobs = [("csv", name, os.path.join(directory, f"{name}.csv")) for name in collections]
+    if columnar and "finance" in collections:
+        jobs.append(("columnar", "finance", os.path.join(directory, "finance" + COLUMNAR_EXTENSION)))
+    # Крупные коллекции первыми, чтобы последним не остался самый долгий файл
+    jobs.sort(key=lambda job: -len(collections[job[1]]))
+    return map_jobs(export_job, jobs, workers, collections)
@@ -0,0 +1,128 @@
+import hashlib
+
+
+def normalize_text(text):
+    # Регистр, ё/е и лишние пробелы не отличают записи друг от друга
+    return " ".join(text.casefold().replace("ё", "е").split())
+
+
+def fingerprint(*parts):
+    # 64 бита: у crc32 на миллионе записей были бы сотни ложных совпадений
+    digest = hashlib.blake2b("\0".join(parts).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def note_keys(note):
+    return (fingerprint(normalize_text(note.title), normalize_text(note.content)),)
+
+
+def task_keys(task):
+    due_date = task.due_date.isoformat() if task.due_date else ""
+    return (fingerprint(normalize_text(task.title), normalize_text(task.description), due_date),)
+
+
+def contact_keys(contact):
+    # Контакт узнается и по номеру, и по почте: в другой выгрузке одно из них может отличаться
+    keys = []
+    if contact.phone_digits:
+        keys.append(fingerprint("phone", contact.phone_digits))
+    email = contact.email.strip().casefold()
+    if email:
+        keys.append(fingerprint("email", email))
+    return tuple(keys) or (fingerprint("name", normalize_text(contact.name)),)
+
+
+def finance_keys(record):
+    return (fingerprint(record.type, f"{record.amount:.2f}", normalize_text(record.category),
+                        record.date.isoformat(), normalize_text(record.description)),)
+
+
+# Коллекция -> (функция отпечатков записи, поля, которые импорт дополняет у совпавшей записи)
+FINGERPRINTS = {
+    "notes": (note_keys, ()),
+    "tasks": (task_keys, ("done", "priority")),
+    "contacts": (contact_keys, ("name", "phone", "email")),
+    "finance": (finance_keys, ()),
+}
+
+
+class RecordFingerprints:
+    # Отпечатки содержимого записей коллекции: отпечаток -> id записи (или
+    # список id, если одинаковых записей несколько, например две одинаковые
+    # покупки за день). При импорте каждой строке файла сопоставляется своя,
+    # еще не занятая запись, поэтому повторный импорт ничего не удваивает,
+    # а одинаковые строки внутри файла не склеиваются.
+
+    def __init__(self, name, records=()):
+        self.keys = FINGERPRINTS[name][0]
+        self.ids = {}
+        self.fingerprints = {}
+        for record in records:
+            self.add(record)
+
+    def __len__(self):
+        return len(self.fingerprints)
+
+    def add(self, record):
+        self.remove(record.id)
+        self.add_keys(record.id, self.keys(record))
+
+    def add_keys(self, record_id, keys):
+        self.fingerprints[record_id] = keys
+        ids = self.ids
+        for key in keys:
+            existing = ids.get(key)
+            if existing is None:
+                ids[key] = record_id
+            elif isinstance(existing, list):
+                existing.append(record_id)
+            else:
+                ids[key] = [existing, record_id]
+
+    def remove(self, record_id):
+        keys = self.fingerprints.pop(record_id, None)
+        if keys is None:
+            return
+        for key in keys:
+            existing = self.ids[key]
+            if isinstance(existing, list):
+                existing.remove(record_id)
+                if len(existing) == 1:
+                    self.ids[key] = existing[0]
+            else:
+                del self.ids[key]
+
+    def match(self, record, taken):
+        # id существующей записи с тем же содержимым, которой еще нет в taken
+        for key in self.keys(record):
+            existing = self.ids.get(key)
+            if existing is None:
+                continue
+            if not isinstance(existing, list):
+                if existing not in taken:
+                    return existing
+                continue
+            for record_id in existing:
+                if record_id not in taken:
+                    return record_id
+        return None
+
+    def to_dict(self):
+        # Плоские списки: у контакта с номером и почтой id повторяется дважды
+        ids = []
+        keys = []
+        for record_id, record_keys in self.fingerprints.items():
+            for key in record_keys:
+                ids.append(record_id)
+                keys.append(key)
+        return {"count": len(self.fingerprints), "ids": ids, "keys": keys}
+
+    @classmethod
+    def from_dict(cls, name, data):
+        fingerprints = cls(name)
+        grouped = {}
+        for record_id, key in zip(data["ids"], data["keys"]):
+            grouped.setdefault(record_id, []).append(key)
+        for record_id, keys in grouped.items():
+            fingerprints.add_keys(record_id, tuple(keys))
+        return fingerprints
@@ -0,0 +1,27 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# Общие данные заданий для дочерних процессов: при fork они наследуются без
+# копирования и pickle, поэтому задание передает только ключи и границы
+SHARED = {}
+
+
+def map_jobs(function, jobs, workers=None, shared=None):
+    # Выполнить function для каждого задания в пуле процессов (или потоков,
+    # если fork недоступен); workers=None - по числу процессоров, 1 - в этом
+    # же процессе. Данные из shared на время работы доступны заданиям через SHARED.
+    # Возвращает результаты в порядке заданий
+    workers = min(len(jobs), workers or os.cpu_count() or 1)
+    SHARED.update(shared or {})
+    try:
+        if workers <= 1:
+            return list(map(function, jobs))
+        if "fork" in multiprocessing.get_all_start_methods():
+            pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("fork"))
+        else:
+            pool = ThreadPoolExecutor(workers)
+        with pool:
+            return list(pool.map(function, jobs))
+    finally:
+        SHARED.clear()
@@ -0,0 +1,131 @@
+import json
+import struct
+import sys
+from array import array
+from datetime import date
+from itertools import accumulate
+
+# Двоичный снимок коллекции: записи хранятся по колонкам, числа - упакованными
+# массивами, даты - порядковыми номерами дней, строки - одним блоком UTF-8
+# с массивом длин. Чтение сводится к нескольким вызовам на колонку вместо
+# разбора JSON по символам.
+MAGIC = b"PABIN1\n"
+HEADER = struct.Struct("<IH")
+COLUMN = struct.Struct("<cQ")
+
+
+def is_binary_snapshot(filename):
+    try:
+        with open(filename, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except FileNotFoundError:
+        return False
+
+
+def pack_array(typecode, values):
+    packed = array(typecode, values)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def unpack_array(typecode, payload):
+    unpacked = array(typecode)
+    unpacked.frombytes(payload)
+    if sys.byteorder == "big":
+        unpacked.byteswap()
+    return unpacked
+
+
+def column_kind(values):
+    if all(type(value) is bool for value in values):
+        return b"?"
+    if all(type(value) is int for value in values):
+        return b"q"
+    if all(type(value) is float for value in values):
+        return b"d"
+    if all(type(value) is str for value in values):
+        return b"s"
+    if all(type(value) is date or value is None for value in values) and any(values):
+        # Пустая дата (срок задачи не задан) хранится как ординал 0
+        return b"t"
+    # Смешанные типы (например, int и float в одной колонке или сроки задач
+    # вперемешку с неразобранным текстом) сохраняются как JSON
+    return b"j"
+
+
+def encode_column(kind, values):
+    if kind == b"?":
+        return bytes(values)
+    if kind == b"q":
+        return pack_array("q", values)
+    if kind == b"d":
+        return pack_array("d", values)
+    if kind == b"t":
+        return pack_array("i", [value.toordinal() if value else 0 for value in values])
+    if kind == b"s":
+        return pack_array("I", [len(value) for value in values]) + "".join(values).encode("utf-8")
+    return json.dumps(values, ensure_ascii=False, default=format_date).encode("utf-8")
+
+
+def format_date(value):
+    # Даты в JSON-колонке - в том же виде, что в to_dict
+    if isinstance(value, date):
+        return value.strftime("%d-%m-%Y")
+    raise TypeError(f"Тип {type(value).__name__} не сохраняется в снимке")
+
+
+def snapshot_value(item, field):
+    value = getattr(item, field)
+    if value is None and field == "due_date":
+        # Неразобранный срок задачи хранится тем текстом, что был
+        return item.due_text or None
+    return value
+
+
+def decode_column(kind, payload, count):
+    if kind == b"?":
+        return [bool(value) for value in payload]
+    if kind == b"q":
+        return unpack_array("q", payload).tolist()
+    if kind == b"d":
+        return unpack_array("d", payload).tolist()
+    if kind == b"t":
+        return [date.fromordinal(value) if value else None for value in unpack_array("i", payload)]
+    if kind == b"s":
+        lengths = unpack_array("I", payload[:count * 4])
+        text = str(payload[count * 4:], "utf-8")
+        ends = list(accumulate(lengths))
+        return [text[end - length:end] for end, length in zip(ends, lengths)]
+    return json.loads(str(payload, "utf-8"))
+
+
+def dump_snapshot(f, fields, items):
+    # f - файл, открытый для записи в двоичном режиме
+    f.write(MAGIC)
+    f.write(HEADER.pack(len(items), len(fields)))
+    for field in fields:
+        values = [snapshot_value(item, field) for item in items]
+        kind = column_kind(values)
+        payload = encode_column(kind, values)
+        f.write(COLUMN.pack(kind, len(payload)))
+        f.write(payload)
+
+
+def load_snapshot(filename, fields, cls):
+    with open(filename, "rb") as f:
+        data = memoryview(f.read())
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"Некорректная структура данных в файле {filename}")
+    offset = len(MAGIC)
+    count, column_count = HEADER.unpack_from(data, offset)
+    offset += HEADER.size
+    if column_count != len(fields):
+        raise ValueError(f"Некорректная структура данных в файле {filename}")
+    columns = []
+    for _ in range(column_count):
+        kind, size = COLUMN.unpack_from(data, offset)
+        offset += COLUMN.size
+        columns.append(decode_column(kind, data[offset:offset + size], count))
+        offset += size
+    return [cls(*row) for row in zip(*columns)]
@@ -0,0 +1,740 @@
+import codecs
+import json
+import mmap
+import os
+import sqlite3
+import struct
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date
+from functools import lru_cache
+from operator import itemgetter
+
+try:
+    import orjson
+except ImportError:  # без orjson JSON разбирается стандартным модулем
+    orjson = None
+
+from snapshot import dump_snapshot, is_binary_snapshot, load_snapshot
+
+# После скольких записей в журнале он сворачивается в снимок
+JOURNAL_COMPACT_THRESHOLD = 1000
+
+
+def parse_json(data):
+    # data - str или bytes; ошибки разбора в обоих случаях - ValueError
+    return json.loads(data) if orjson is None else orjson.loads(data)
+
+
+@lru_cache(maxsize=None)
+def record_fields(cls):
+    code = cls.__init__.__code__
+    return code.co_varnames[1:code.co_argcount]
+
+
+@lru_cache(maxsize=None)
+def record_schema(cls):
+    # Схема класса записи готовится один раз: набор обязательных ключей
+    # и функция, достающая значения в порядке аргументов конструктора
+    fields = record_fields(cls)
+    return frozenset(fields), itemgetter(*fields)
+
+
+def build_records(cls, items, source):
+    # Массовое создание записей: проверка ключей - одна операция над множествами,
+    # аргументы передаются позиционно, без разбора **kwargs
+    required, values = record_schema(cls)
+    records = []
+    append = records.append
+    for item in items:
+        if not required <= item.keys():
+            raise ValueError(f"Некорректная структура данных в файле {source}")
+        append(cls(*values(item)))
+    return records
+
+
+@contextmanager
+def atomic_write(filename, mode="w"):
+    # Запись во временный файл рядом с целевым, fsync и атомарное переименование:
+    # при сбое на диске остается либо старая, либо новая версия файла целиком
+    directory = os.path.dirname(filename) or "."
+    fd, temp_filename = tempfile.mkstemp(dir=directory, prefix=os.path.basename(filename), suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode, **({} if "b" in mode else {"encoding": "utf-8"})) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_filename, filename)
+    except BaseException:
+        if os.path.exists(temp_filename):
+            os.remove(temp_filename)
+        raise
+
+
+# Форматы снимков коллекций и расширения их файлов
+SNAPSHOT_FORMATS = {"json": ".json", "binary": ".bin"}
+
+
+class JsonStorage:
+    def __init__(self, directory=".", snapshot_format="json"):
+        self.directory = directory
+        self.snapshot_format = snapshot_format
+        self.journal_sizes = {}
+
+    def snapshot_filename(self, name, snapshot_format=None):
+        extension = SNAPSHOT_FORMATS[snapshot_format or self.snapshot_format]
+        return os.path.join(self.directory, name + extension)
+
+    def find_snapshot(self, name):
+        # Снимок в выбранном формате, а если его нет - в любом другом
+        filename = self.snapshot_filename(name)
+        if not os.path.exists(filename):
+            for snapshot_format in SNAPSHOT_FORMATS:
+                other = self.snapshot_filename(name, snapshot_format)
+                if os.path.exists(other):
+                    return other
+        return filename
+
+    def meta_filename(self, name):
+        return os.path.join(self.directory, f"{name}.json")
+
+    def journal_filename(self, name):
+        return os.path.join(self.directory, f"{name}.journal")
+
+    def load(self, name, cls):
+        filename = self.find_snapshot(name)
+        if is_binary_snapshot(filename):
+            items = self.load_binary(filename, cls)
+        else:
+            items = self.load_json(filename, cls)
+        return self.replay_journal(name, cls, items)
+
+    def apply(self, name, cls, entries, items):
+        # entries: список пар (op, запись) для "put" или (op, id) для "delete";
+        # items - вся коллекция, нужна только для сворачивания журнала
+        if not entries:
+            return
+        lines = []
+        for op, value in entries:
+            if op == "put":
+                lines.append(json.dumps({"op": op, "item": value.to_dict()}, ensure_ascii=False))
+            else:
+                lines.append(json.dumps({"op": op, "id": value}))
+        with open(self.journal_filename(name), "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.journal_sizes[name] = self.journal_sizes.get(name, 0) + len(lines)
+        # Журнал сворачивается, когда он длиннее снимка, поэтому большие импорты
+        # не переписывают снимок на каждой порции
+        if self.journal_sizes[name] >= max(JOURNAL_COMPACT_THRESHOLD, len(items)):
+            self.save(name, cls, items)
+
+    def save(self, name, cls, items):
+        filename = self.snapshot_filename(name)
+        if self.snapshot_format == "binary":
+            with atomic_write(filename, "wb") as f:
+                dump_snapshot(f, record_fields(cls), items)
+        else:
+            self.save_json(filename, items)
+        # Снимок в другом формате устарел
+        for snapshot_format in SNAPSHOT_FORMATS:
+            other = self.snapshot_filename(name, snapshot_format)
+            if other != filename and os.path.exists(other):
+                os.remove(other)
+        with open(self.journal_filename(name), "w", encoding="utf-8"):
+            pass
+        self.journal_sizes[name] = 0
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+    @contextmanager
+    def reading(self):
+        # Хранилище для одновременного чтения нескольких коллекций из потоков
+        yield self
+
+    def shards(self, name):
+        # Коллекции не делятся на части (см. ShardedStorage)
+        return []
+
+    # Служебные данные (итоги, индексы) хранятся рядом с коллекциями
+    def load_meta(self, name):
+        try:
+            with open(self.meta_filename(name), "rb") as f:
+                return parse_json(f.read())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def save_meta(self, name, data):
+        with atomic_write(self.meta_filename(name)) as f:
+            json.dump(data, f, ensure_ascii=False)
+
+    def load_json(self, filename, cls):
+        try:
+            with open(filename, "rb") as f:
+                return build_records(cls, parse_json(f.read()), filename)
+        except FileNotFoundError:
+            # Снимка еще нет (до первого сворачивания журнала) - коллекция пока пуста
+            return []
+        except ValueError as e:
+            print(f"Ошибка при загрузке данных из {filename}: {e}", file=sys.stderr)
+            return []
+
+    def load_binary(self, filename, cls):
+        try:
+            return load_snapshot(filename, record_fields(cls), cls)
+        except FileNotFoundError:
+            return []
+        except (ValueError, struct.error) as e:
+            print(f"Ошибка при загрузке данных из {filename}: {e}", file=sys.stderr)
+            return []
+
+    def save_json(self, filename, data):
+        with atomic_write(filename) as f:
+            json.dump([item.to_dict() for item in data], f, ensure_ascii=False, indent=4)
+
+    def read_journal(self, name):
+        # {id: последнее состояние записи или None, если запись удалена}
+        filename = self.journal_filename(name)
+        changes = {}
+        count = 0
+        # Конец последней целой строки: все после него обрезается, иначе новые
+        # записи дописывались бы за поврежденной строкой и терялись при загрузке
+        valid_end = 0
+        try:
+            with open(filename, "r+b") as f:
+                for line in f:
+                    if not line.strip():
+                        valid_end += len(line)
+                        continue
+                    try:
+                        entry = parse_json(line)
+                    except ValueError:
+                        # Недописанная строка после сбоя - дальше журнал не читаем
+                        print(f"Журнал {filename} поврежден, строка {count + 1} и следующие отброшены.",
+                              file=sys.stderr)
+                        break
+                    count += 1
+                    valid_end += len(line)
+                    if entry["op"] == "put":
+                        changes[entry["item"]["id"]] = entry["item"]
+                    elif entry["op"] == "delete":
+                        changes[entry["id"]] = None
+                size = f.seek(0, os.SEEK_END)
+                if valid_end < size:
+                    f.truncate(valid_end)
+                if valid_end:
+                    # Последняя строка могла оборваться перед переводом строки
+                    f.seek(valid_end - 1)
+                    if f.read(1) != b"\n":
+                        f.write(b"\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+        except FileNotFoundError:
+            pass
+        self.journal_sizes[name] = count
+        return changes
+
+    def replay_journal(self, name, cls, items):
+        changes = self.read_journal(name)
+        if not changes:
+            return items
+        result = []
+        for item in items:
+            if item.id in changes:
+                data = changes.pop(item.id)
+                if data is not None:
+                    result.append(cls(**data))
+            else:
+                result.append(item)
+        result.extend(cls(**data) for data in changes.values() if data is not None)
+        return result
+
+    def iter_json(self, filename, block_size=1 << 20):
+        # Потоковое чтение JSON-массива через mmap: в памяти только текущий блок текста
+        decoder = json.JSONDecoder()
+        with open(filename, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if not size:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                text_decoder = codecs.getincrementaldecoder("utf-8")()
+                buffer = ""
+                position = 0
+                offset = 0
+                while True:
+                    while position < len(buffer) and buffer[position] in " \t\r\n[,":
+                        position += 1
+                    if position < len(buffer) and buffer[position] == "]":
+                        return
+                    try:
+                        if position == len(buffer):
+                            raise ValueError("нужен следующий блок")
+                        item, position = decoder.raw_decode(buffer, position)
+                    except ValueError:
+                        # Объект оборвался на границе блока - дочитываем следующий
+                        if offset >= size:
+                            if buffer[position:].strip():
+                                raise ValueError(f"Некорректная структура данных в файле {filename}")
+                            return
+                        chunk = mapped[offset:offset + block_size]
+                        offset += block_size
+                        buffer = buffer[position:] + text_decoder.decode(chunk, offset >= size)
+                        position = 0
+                        continue
+                    yield item
+
+    def iter_pages(self, name, cls, page_size=1000):
+        changes = self.read_journal(name)
+        page = []
+        filename = self.find_snapshot(name)
+        if is_binary_snapshot(filename):
+            # Двоичный снимок компактен и читается целиком
+            items = (item.to_dict() for item in self.load_binary(filename, cls))
+        elif os.path.exists(filename):
+            items = self.iter_json(filename)
+        else:
+            items = ()
+        for item in items:
+            if item["id"] in changes:
+                item = changes.pop(item["id"])
+                if item is None:
+                    continue
+            page.append(cls(**item))
+            if len(page) >= page_size:
+                yield page
+                page = []
+        for item in changes.values():
+            if item is not None:
+                page.append(cls(**item))
+                if len(page) >= page_size:
+                    yield page
+                    page = []
+        if page:
+            yield page
+
+
+class SqliteStorage:
+    def __init__(self, filename="assistant.db"):
+        self.filename = filename
+        # Соединением может пользоваться фоновый BackgroundWriter, доступ к нему он сериализует сам
+        self.connection = sqlite3.connect(filename, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        with self.connection:
+            self.connection.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, data TEXT)")
+        self.created = set()
+
+    def ensure_table(self, name, cls):
+        if name in self.created:
+            return
+        fields = record_fields(cls)
+        columns = ", ".join("id INTEGER PRIMARY KEY" if field == "id" else field for field in fields)
+        with self.connection:
+            self.connection.execute(f"CREATE TABLE IF NOT EXISTS {name} ({columns})")
+        self.created.add(name)
+
+    def to_row(self, item, fields):
+        row = []
+        for field in fields:
+            value = getattr(item, field)
+            if value is None and field == "due_date":
+                # Неразобранный срок задачи хранится тем текстом, что был
+                value = item.due_text or None
+            # Даты храним в ISO, чтобы индекс по дате был упорядочен
+            row.append(value.isoformat() if isinstance(value, date) else value)
+        return row
+
+    def from_row(self, cls, fields, row):
+        item = dict(zip(fields, row))
+        if cls.__name__ == "FinanceRecord":
+            item["date"] = date.fromisoformat(item["date"])
+        if item.get("due_date"):
+            # Старые базы хранят срок задачи строкой ДД-ММ-ГГГГ, ее разберет сам Task
+            try:
+                item["due_date"] = date.fromisoformat(item["due_date"])
+            except ValueError:
+                pass
+        if "done" in item:
+            item["done"] = bool(item["done"])
+        return cls(**item)
+
+    def load(self, name, cls):
+        self.ensure_table(name, cls)
+        fields = record_fields(cls)
+        cursor = self.connection.execute(f"SELECT {', '.join(fields)} FROM {name} ORDER BY rowid")
+        return [self.from_row(cls, fields, row) for row in cursor]
+
+    def apply(self, name, cls, entries, items):
+        if not entries:
+            return
+        self.ensure_table(name, cls)
+        fields = record_fields(cls)
+        insert = (f"INSERT OR REPLACE INTO {name} ({', '.join(fields)}) "
+                  f"VALUES ({', '.join('?' * len(fields))})")
+        with self.connection:
+            for op, value in entries:
+                if op == "put":
+                    self.connection.execute(insert, self.to_row(value, fields))
+                elif op == "delete":
+                    self.connection.execute(f"DELETE FROM {name} WHERE id = ?", (value,))
+
+    def save(self, name, cls, items):
+        self.ensure_table(name, cls)
+        fields = record_fields(cls)
+        with self.connection:
+            self.connection.execute(f"DELETE FROM {name}")
+            self.connection.executemany(
+                f"INSERT INTO {name} ({', '.join(fields)}) VALUES ({', '.join('?' * len(fields))})",
+                (self.to_row(item, fields) for item in items))
+
+    def load_meta(self, name):
+        row = self.connection.execute("SELECT data FROM meta WHERE name = ?", (name,)).fetchone()
+        return parse_json(row[0]) if row else None
+
+    def save_meta(self, name, data):
+        with self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO meta (name, data) VALUES (?, ?)",
+                                    (name, json.dumps(data, ensure_ascii=False)))
+
+    def iter_pages(self, name, cls, page_size=1000):
+        self.ensure_table(name, cls)
+        fields = record_fields(cls)
+        cursor = self.connection.execute(f"SELECT {', '.join(fields)} FROM {name} ORDER BY rowid")
+        while True:
+            rows = cursor.fetchmany(page_size)
+            if not rows:
+                break
+            yield [self.from_row(cls, fields, row) for row in rows]
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.connection.close()
+
+    @contextmanager
+    def reading(self):
+        yield self
+
+    def shards(self, name):
+        return []
+
+
+class BackgroundWriter:
+    # Обертка над хранилищем: изменения копятся и записываются фоновым потоком,
+    # когда поток изменений затихает на delay секунд (но не реже раза в max_delay).
+    # Повторные изменения одной записи схлопываются, каждая коллекция пишется одним вызовом.
+    # lock защищает очередь изменений, io_lock - само хранилище; порядок захвата: io_lock, затем lock.
+
+    def __init__(self, storage, delay=0.5, max_delay=5.0):
+        self.storage = storage
+        self.delay = delay
+        self.max_delay = max_delay
+        self.lock = threading.Lock()
+        self.io_lock = threading.Lock()
+        self.condition = threading.Condition(self.lock)
+        self.pending = {}
+        self.pending_meta = {}
+        self.first_change = None
+        self.last_change = None
+        self.closed = False
+        self.thread = threading.Thread(target=self.run, name="BackgroundWriter", daemon=True)
+        self.thread.start()
+
+    def load(self, name, cls):
+        # Накопленные изменения сначала дописываются, иначе перечитанная
+        # коллекция (например, после отката транзакции) их бы потеряла
+        with self.io_lock:
+            self.write_queued()
+            return self.storage.load(name, cls)
+
+    def iter_pages(self, name, cls, page_size=1000):
+        # Блокировка берется на чтение каждой страницы, а не на весь обход:
+        # пока вызывающий обрабатывает страницу, фоновый поток может писать
+        with self.io_lock:
+            self.write_queued()
+        pages = self.storage.iter_pages(name, cls, page_size)
+        while True:
+            with self.io_lock:
+                page = next(pages, None)
+            if page is None:
+                return
+            yield page
+
+    def load_meta(self, name):
+        with self.lock:
+            if name in self.pending_meta:
+                return self.pending_meta[name]
+        with self.io_lock:
+            return self.storage.load_meta(name)
+
+    def touch(self):
+        now = time.monotonic()
+        if self.first_change is None:
+            self.first_change = now
+        self.last_change = now
+        self.condition.notify()
+
+    def apply(self, name, cls, entries, items):
+        with self.lock:
+            cls, _, changes = self.pending.get(name, (cls, items, {}))
+            for op, value in entries:
+                item_id = value.id if op == "put" else value
+                changes.pop(item_id, None)
+                changes[item_id] = (op, value)
+            # Для сворачивания журнала нужна актуальная коллекция
+            self.pending[name] = (cls, items, changes)
+            self.touch()
+
+    def save(self, name, cls, items):
+        with self.io_lock:
+            with self.lock:
+                self.pending.pop(name, None)
+            self.storage.save(name, cls, items)
+
+    def save_meta(self, name, data):
+        with self.lock:
+            self.pending_meta[name] = data
+            self.touch()
+
+    def write_pending(self):
+        with self.io_lock:
+            self.write_queued()
+
+    def write_queued(self):
+        # Вызывается под io_lock
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            pending_meta, self.pending_meta = self.pending_meta, {}
+            self.first_change = None
+            self.last_change = None
+        for name, (cls, items, changes) in pending.items():
+            self.storage.apply(name, cls, list(changes.values()), items)
+        for name, data in pending_meta.items():
+            self.storage.save_meta(name, data)
+
+    def wait_for_quiet(self):
+        # Ждать, пока изменения не затихнут; False - писатель закрывается
+        with self.condition:
+            while not self.closed:
+                if self.last_change is None:
+                    self.condition.wait()
+                    continue
+                now = time.monotonic()
+                deadline = min(self.last_change + self.delay, self.first_change + self.max_delay)
+                if now >= deadline:
+                    return True
+                self.condition.wait(deadline - now)
+            return False
+
+    def run(self):
+        while self.wait_for_quiet():
+            try:
+                self.write_pending()
+            except Exception as e:
+                print(f"Ошибка при сохранении данных: {e}", file=sys.stderr)
+
+    def shards(self, name):
+        with self.io_lock:
+            return self.storage.shards(name)
+
+    @contextmanager
+    def reading(self):
+        # Очередь дописывается, и io_lock берется один раз на все чтение:
+        # потоки загрузки читают само хранилище и не ждут друг друга
+        with self.io_lock:
+            self.write_queued()
+            yield self.storage
+
+    def load_shard(self, name, cls, shard):
+        # Части читаются параллельно, без io_lock. Сначала дожидаемся идущей
+        # записи и дописываем накопленные изменения этой коллекции
+        with self.io_lock:
+            with self.lock:
+                dirty = name in self.pending
+        if dirty:
+            self.write_pending()
+        return self.storage.load_shard(name, cls, shard)
+
+    def flush(self):
+        self.write_pending()
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        self.thread.join()
+        self.write_pending()
+        self.storage.close()
+
+
+class ShardItems:
+    # Записи одной части коллекции без копирования списка: длина известна
+    # заранее, а обход фильтрует всю коллекцию и нужен только при сворачивании журнала
+
+    def __init__(self, items, shard_of, shard, size):
+        self.items = items
+        self.shard_of = shard_of
+        self.shard = shard
+        self.size = size
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        return (item for item in self.items if self.shard_of.get(item.id) == self.shard)
+
+
+class ShardedStorage:
+    # Обертка над хранилищем, которая делит коллекции из sharded на части
+    # по году поля даты: finance хранится как finance_2023, finance_2024 и т. д.
+    # Список частей лежит в служебных данных "<коллекция>_shards". Отчет за
+    # период может загрузить только нужные годы (load_shard), не читая остальные.
+
+    def __init__(self, storage, sharded=None):
+        self.storage = storage
+        # {коллекция: поле даты}
+        self.sharded = sharded or {"finance": "date"}
+        # {коллекция: {id: часть}} и {коллекция: {часть: число записей}}
+        self.shard_of = {}
+        self.shard_sizes = {}
+
+    def shard_name(self, name, shard):
+        return f"{name}_{shard}"
+
+    def shard_key(self, name, item):
+        return getattr(item, self.sharded[name]).year
+
+    def shards(self, name):
+        if name not in self.sharded:
+            return []
+        return self.storage.load_meta(f"{name}_shards") or []
+
+    @contextmanager
+    def reading(self):
+        yield self
+
+    def load_shard(self, name, cls, shard):
+        return self.storage.load(self.shard_name(name, shard), cls)
+
+    def load_shards(self, name, cls, shards):
+        # Части читаются параллельно: {часть: записи}
+        if not shards:
+            return {}
+        with ThreadPoolExecutor(max_workers=len(shards)) as pool:
+            return dict(zip(shards, pool.map(lambda shard: self.load_shard(name, cls, shard), shards)))
+
+    def load(self, name, cls):
+        if name not in self.sharded:
+            return self.storage.load(name, cls)
+        shards = self.storage.load_meta(f"{name}_shards")
+        if shards is None:
+            # Коллекция еще не разделена: читаем целиком и сохраняем по частям
+            items = self.storage.load(name, cls)
+            self.save(name, cls, items)
+            return items
+        items = []
+        shard_of = {}
+        shard_sizes = {}
+        for shard, part in self.load_shards(name, cls, shards).items():
+            shard_of.update((item.id, shard) for item in part)
+            shard_sizes[shard] = len(part)
+            items.extend(part)
+        self.shard_of[name] = shard_of
+        self.shard_sizes[name] = shard_sizes
+        return items
+
+    def apply(self, name, cls, entries, items):
+        if name not in self.sharded:
+            return self.storage.apply(name, cls, entries, items)
+        if name not in self.shard_sizes:
+            # Карта частей строится при загрузке; без нее не узнать, где лежат записи
+            self.load(name, cls)
+        shard_of = self.shard_of[name]
+        shard_sizes = self.shard_sizes[name]
+        before = sorted(shard for shard, size in shard_sizes.items() if size)
+        routed = {}
+        for op, value in entries:
+            item_id = value.id if op == "put" else value
+            old = shard_of.pop(item_id, None)
+            new = self.shard_key(name, value) if op == "put" else None
+            # Запись, у которой сменился год, переезжает в другую часть
+            if old is not None and old != new:
+                routed.setdefault(old, []).append(("delete", item_id))
+                shard_sizes[old] -= 1
+            if new is not None:
+                routed.setdefault(new, []).append((op, value))
+                shard_of[item_id] = new
+                if old != new:
+                    shard_sizes[new] = shard_sizes.get(new, 0) + 1
+        for shard, shard_entries in routed.items():
+            self.storage.apply(self.shard_name(name, shard), cls, shard_entries,
+                               ShardItems(items, shard_of, shard, shard_sizes[shard]))
+        shards = sorted(shard for shard, size in shard_sizes.items() if size)
+        if shards != before:
+            self.storage.save_meta(f"{name}_shards", shards)
+
+    def save(self, name, cls, items):
+        if name not in self.sharded:
+            return self.storage.save(name, cls, items)
+        parts = {}
+        for item in items:
+            parts.setdefault(self.shard_key(name, item), []).append(item)
+        # Опустевшие части перезаписываются пустыми
+        for shard in set(self.shards(name)) | set(parts):
+            self.storage.save(self.shard_name(name, shard), cls, parts.get(shard, []))
+        # Снимок и журнал неразделенной коллекции больше не нужны
+        self.storage.save(name, cls, [])
+        self.shard_of[name] = {item.id: shard for shard, part in parts.items() for item in part}
+        self.shard_sizes[name] = {shard: len(part) for shard, part in parts.items()}
+        self.storage.save_meta(f"{name}_shards", sorted(parts))
+
+    def iter_pages(self, name, cls, page_size=1000):
+        if name not in self.sharded or self.storage.load_meta(f"{name}_shards") is None:
+            yield from self.storage.iter_pages(name, cls, page_size)
+            return
+        for shard in self.shards(name):
+            yield from self.storage.iter_pages(self.shard_name(name, shard), cls, page_size)
+
+    def load_meta(self, name):
+        return self.storage.load_meta(name)
+
+    def save_meta(self, name, data):
+        self.storage.save_meta(name, data)
+
+    def flush(self):
+        self.storage.flush()
+
+    def close(self):
+        self.storage.close()
+
+
+def convert_snapshots(collections, snapshot_format, directory="."):
+    # Пересохранить снимки коллекций (с учетом журнала) в другом формате
+    source = JsonStorage(directory)
+    target = JsonStorage(directory, snapshot_format)
+    sizes = {}
+    for name, cls in collections.items():
+        target.save(name, cls, source.load(name, cls))
+        sizes[name] = os.path.getsize(target.snapshot_filename(name))
+    return sizes
+
+
+def import_json_into(target, collections, directory="."):
+    # Перенос существующих JSON-файлов (снимок + журнал) в другое хранилище
+    source = JsonStorage(directory)
+    counts = {}
+    for name, cls in collections.items():
+        items = source.load(name, cls)
+        target.save(name, cls, items)
+        counts[name] = len(items)
+    return counts
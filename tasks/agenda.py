@@ -0,0 +1,97 @@
+import heapq
+from datetime import date
+
+from tasks import priority_rank
+
+
+class TaskAgenda:
+    # Очередь невыполненных задач со сроком: куча по (срок, приоритет, id).
+    # Устаревшие элементы кучи (задача изменена, выполнена или удалена) не
+    # удаляются сразу, а пропускаются при обходе; когда их больше половины,
+    # куча перестраивается. Обход в порядке сроков идет по дереву кучи через
+    # вспомогательную кучу границы, поэтому первые k задач стоят O(k log n).
+
+    def __init__(self, tasks=()):
+        self.keys = {}
+        self.done = set()
+        self.undated = set()
+        self.heap = []
+        for task in tasks:
+            self.put(task, rebuild=False)
+        self.rebuild()
+
+    def rebuild(self):
+        self.heap = [key + (task_id,) for task_id, key in self.keys.items()]
+        heapq.heapify(self.heap)
+
+    def put(self, task, rebuild=True):
+        if task.done:
+            self.remove(task.id)
+            self.done.add(task.id)
+        elif task.due_date is None:
+            self.remove(task.id)
+            self.undated.add(task.id)
+        else:
+            key = (task.due_date.toordinal(), priority_rank(task.priority))
+            if self.keys.get(task.id) == key:
+                # Срок и приоритет не изменились - элемент в куче еще действителен
+                return
+            self.remove(task.id)
+            self.keys[task.id] = key
+            if rebuild:
+                heapq.heappush(self.heap, key + (task.id,))
+
+    def remove(self, task_id):
+        self.done.discard(task_id)
+        self.undated.discard(task_id)
+        if self.keys.pop(task_id, None) is not None and len(self.heap) > 2 * len(self.keys) + 64:
+            self.rebuild()
+
+    def ordered(self):
+        # Генератор (срок, приоритет, id) невыполненных задач по возрастанию срока.
+        # Задача, которой вернули прежний срок, лежит в куче дважды с одним
+        # ключом - такие повторы пропускаются
+        heap = self.heap
+        frontier = [(heap[0], 0)] if heap else []
+        seen = set()
+        while frontier:
+            entry, position = heapq.heappop(frontier)
+            for child in (2 * position + 1, 2 * position + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child], child))
+            if entry[2] not in seen and self.keys.get(entry[2]) == entry[:2]:
+                seen.add(entry[2])
+                yield entry
+
+    def upcoming(self, count, today=None):
+        # Ближайшие count задач со сроком не раньше today (или вообще все по сроку)
+        start = today.toordinal() if today else None
+        result = []
+        for due, _, task_id in self.ordered():
+            if start is not None and due < start:
+                continue
+            result.append(task_id)
+            if len(result) >= count:
+                break
+        return result
+
+    def overdue(self, today=None, priority=None):
+        # Просроченные задачи; priority - ограничить приоритетом (1 - высокий)
+        today = (today or date.today()).toordinal()
+        result = []
+        for due, rank, task_id in self.ordered():
+            if due >= today:
+                break
+            if priority is None or rank == priority:
+                result.append(task_id)
+        return result
+
+    def due_on(self, day=None):
+        day = (day or date.today()).toordinal()
+        result = []
+        for due, _, task_id in self.ordered():
+            if due > day:
+                break
+            if due == day:
+                result.append(task_id)
+        return result
@@ -1,4 +1,34 @@
+from datetime import datetime, date
+from functools import lru_cache
+
+# Приоритет хранится так, как его ввели: цифрой или словом
+PRIORITY_NAMES = {1: "Высокий", 2: "Средний", 3: "Низкий"}
+PRIORITY_RANKS = {"1": 1, "2": 2, "3": 3, "высокий": 1, "средний": 2, "низкий": 3}
+
+
+def priority_rank(priority):
+    # 1 - высокий, 3 - низкий; неизвестный приоритет считается средним
+    return PRIORITY_RANKS.get(str(priority).strip().lower(), 2)
+
+
+def parse_due_date(value):
+    if isinstance(value, date) or value is None:
+        return value
+    return parse_due_date_text(value)
+
+
+# Сроки повторяются у тысяч задач, а strptime - самая дорогая часть создания задачи
+@lru_cache(maxsize=8192)
+def parse_due_date_text(value):
+    try:
+        return datetime.strptime(value.strip(), "%d-%m-%Y").date()
+    except ValueError:
+        return None
+
+
 class Task:
+    __slots__ = ("id", "title", "description", "done", "priority", "_due_date", "due_text")
+
     def __init__(self, id, title, description, done, priority, due_date):
         self.id = id
         self.title = title
@@ -7,6 +37,18 @@ class Task:
         self.priority = priority
         self.due_date = due_date
 
+    @property
+    def due_date(self):
+        return self._due_date
+
+    @due_date.setter
+    def due_date(self, value):
+        # Срок разбирается один раз, при записи; пустой или неверный срок - None.
+        # Неразобранный текст (старые записи в другом формате) сохраняется как
+        # был, чтобы при следующем сохранении он не пропал
+        self._due_date = parse_due_date(value)
+        self.due_text = value.strip() if self._due_date is None and isinstance(value, str) else ""
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -14,5 +56,5 @@ class Task:
             "description": self.description,
             "done": self.done,
             "priority": self.priority,
-            "due_date": self.due_date
+            "due_date": self.due_date.strftime("%d-%m-%Y") if self.due_date else self.due_text
         }